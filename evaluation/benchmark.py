@@ -0,0 +1,425 @@
+import argparse
+import functools
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from pybeamline.bevent import BEvent
+
+from evaluation.shared import handler_factories
+from memory_manager.manager import MemoryManager
+from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.policies.exponential_decay_counting_policy import ExponentialDecayCountingPolicy
+from memory_manager.policies.lossy_count_policy import LossyCountPolicy
+from memory_manager.policies.lossy_count_with_budget_policy import LossyCountWithBudgetPolicy
+from memory_manager.policies.reservoir_sampling_policy import ReservoirSamplingPolicy
+from memory_manager.policies.sliding_window_policy import SlidingWindowPolicy
+from memory_manager.policies.tumbling_window_policy import TumblingWindowPolicy
+from memory_manager.sharded_manager import ShardedMemoryManager
+
+FORMAT_VERSION = 1  # Stored in the result files, bump it when their layout changes
+BUDGETS = [5, 100, 1000]  # Default sweep, which runs in minutes
+STREAM_LENGTHS = [10_000]
+FULL_BUDGETS = [5, 100, 1000, 10000, 100000]  # Sweep of run --full, which takes hours
+FULL_STREAM_LENGTHS = [10_000, 100_000, 1_000_000]
+OPEN_CASES = 1000  # Cases running concurrently in the synthetic stream
+ACTIVITIES = ["register", "check", "approve", "reject", "ship", "invoice", "pay", "close"]
+CHUNK_SIZE = 10_000  # Events generated at once, outside the timed section
+QUERIES = 100  # get_data calls timed per cell
+REPEATS = 1  # Runs per cell, of which the best is kept
+THRESHOLD = 0.1  # Relative slowdown that compare reports as a regression
+COMPARED_METRICS = ["per_second", "p50_us", "p95_us", "p99_us"]  # max_us is too noisy to flag
+RESULTS_FILE = "evaluation/results/benchmark.json"
+SHARD_COUNTS = [1, 2, 4]  # Shard counts compared against a single manager by run_sharded
+SHARDED_RESULTS_FILE = "evaluation/results/sharded.json"
+
+# Factories taking the budget and a seed, so that every policy is swept over the same budgets
+policy_builders: Dict[str, Callable[[int, int], BasePolicy]] = {
+    "SW": lambda budget, seed: SlidingWindowPolicy(budget),
+    "TW": lambda budget, seed: TumblingWindowPolicy(budget),
+    "RS": lambda budget, seed: ReservoirSamplingPolicy(budget, seed),
+    "LC": lambda budget, seed: LossyCountPolicy(1 / budget),
+    "LCB": lambda budget, seed: LossyCountWithBudgetPolicy(budget),
+    "EDC": lambda budget, seed: ExponentialDecayCountingPolicy(budget),
+}
+
+
+def synthetic_stream(num_events: int, open_cases: int = OPEN_CASES, seed: int = 0) -> Iterator[BEvent]:
+    """
+    Generate a reproducible stream of interleaved cases, lazily so that streams of millions of events fit in memory.
+    Every case walks through the activities in 3 to 12 steps and is replaced by a new case once it ends,
+    so the stream keeps a fixed number of open cases and a bounded number of variants.
+    Args:
+        num_events (int): Number of events to generate.
+        open_cases (int): Number of cases running at any time.
+        seed (int): Seed of the random generator.
+    Returns:
+        Iterator[BEvent]: The events, in stream order.
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    cases = [[str(case), 0, rng.randint(3, 12)] for case in range(open_cases)]  # [case ID, activity, remaining events]
+    next_case = open_cases
+    for i in range(num_events):
+        case = cases[rng.randrange(open_cases)]
+        case[1] += rng.randint(1, 2)
+        yield BEvent(ACTIVITIES[case[1] % len(ACTIVITIES)], case[0], "synthetic", start + timedelta(seconds=i))
+        case[2] -= 1
+        if case[2] == 0:
+            case[:] = [str(next_case), 0, rng.randint(3, 12)]
+            next_case += 1
+
+
+def summarize(latencies: array) -> Dict[str, float]:
+    """
+    Summarize the latencies of a timed operation.
+    Args:
+        latencies (array): Nanoseconds per call.
+    Returns:
+        Dict[str, float]: Number of calls, calls per second over the timed calls, and mean, p50, p95, p99 and max latency in µs.
+    """
+    if not latencies:
+        return {"calls": 0}
+    values = np.frombuffer(latencies, dtype=np.int64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) / 1000
+    return {
+        "calls": len(values),
+        "per_second": len(values) / (int(values.sum()) or 1) * 1e9,
+        "mean_us": float(values.mean()) / 1000,
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+        "max_us": int(values.max()) / 1000,
+    }
+
+
+def build_policy(policy_key: str, budget: int, seed: int) -> BasePolicy:
+    """
+    Build a policy of policy_builders. Unlike the lambdas, a partial of this function can be sent to a shard process.
+    Args:
+        policy_key (str): Key of the policy in policy_builders.
+        budget (int): Budget of the policy.
+        seed (int): Seed of the policy.
+    Returns:
+        BasePolicy: The policy.
+    """
+    return policy_builders[policy_key](budget, seed)
+
+
+def run_cell(policy_key: str, handler_key: str, budget: int, num_events: int, seed: int = 0,
+             warmup: Optional[int] = None, queries: int = QUERIES) -> Dict[str, Any]:
+    """
+    Benchmark one memory manager: add_event on every event of a synthetic stream, then get_data on the final summary.
+    The summary is filled with untimed warmup events first, so that add_event is measured in the steady state.
+    Events are generated in chunks between timed calls, and get_data is only called once ingestion is over,
+    so neither disturbs the add_event timings.
+    Args:
+        policy_key (str): Key of the policy in policy_builders.
+        handler_key (str): Key of the handler in handler_factories.
+        budget (int): Budget of the policy.
+        num_events (int): Number of timed add_event calls.
+        seed (int): Seed of the stream and of the policy.
+        warmup (Optional[int]): Number of untimed events before, 2 * budget + 1000 if None.
+        queries (int): Number of timed get_data calls.
+    Returns:
+        Dict[str, Any]: The cell parameters with the add_event and get_data summaries.
+    """
+    warmup = 2 * budget + 1000 if warmup is None else warmup
+    random.seed(seed)
+    mm = MemoryManager(policy_builders[policy_key](budget, seed), handler_factories[handler_key]())
+    stream = synthetic_stream(warmup + num_events, seed=seed)
+    for event in islice(stream, warmup):
+        mm.add_event(event)
+
+    clock = time.perf_counter_ns
+    add_latencies = array('q')
+    gc.collect()
+    while len(add_latencies) < num_events:
+        for event in list(islice(stream, min(CHUNK_SIZE, num_events - len(add_latencies)))):
+            start = clock()
+            mm.add_event(event)
+            add_latencies.append(clock() - start)
+
+    query_latencies = array('q')
+    gc.collect()
+    for _ in range(queries):
+        start = clock()
+        mm.get_data()
+        query_latencies.append(clock() - start)
+
+    return {
+        "policy": policy_key,
+        "handler": handler_key,
+        "budget": budget,
+        "events": num_events,
+        "warmup": warmup,
+        "seed": seed,
+        "add_event": summarize(add_latencies),
+        "get_data": summarize(query_latencies),
+    }
+
+
+def best_of(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine repeated runs of a cell into their best, metric by metric, which filters out noise from the machine.
+    Args:
+        runs (List[Dict[str, Any]]): Results of run_cell for the same cell.
+    Returns:
+        Dict[str, Any]: The first run, with the highest throughput and the lowest latencies of all runs.
+    """
+    best = dict(runs[0], repeats=len(runs))
+    for operation in ("add_event", "get_data"):
+        summaries = [run[operation] for run in runs]
+        best[operation] = {
+            metric: (max if metric == "per_second" else min)(summary[metric] for summary in summaries)
+            for metric in summaries[0]
+        }
+    return best
+
+
+def _git_commit() -> Optional[str]:
+    """
+    Return the commit the benchmark runs on, if it runs in a git checkout.
+    Returns:
+        Optional[str]: The commit hash, or None.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(policy_keys: Optional[Sequence[str]] = None, handler_keys: Optional[Sequence[str]] = None,
+                  budgets: Sequence[int] = BUDGETS, stream_lengths: Sequence[int] = STREAM_LENGTHS, seed: int = 0,
+                  warmup: Optional[int] = None, queries: int = QUERIES, repeats: int = REPEATS,
+                  output: Optional[str] = RESULTS_FILE) -> Dict[str, Any]:
+    """
+    Run the benchmark for every combination of policy, handler, budget and stream length, and write the results as JSON.
+    Cells run one after another in this process, since concurrent cells would slow each other down.
+    Args:
+        policy_keys (Optional[Sequence[str]]): Keys of policy_builders to benchmark, all if None.
+        handler_keys (Optional[Sequence[str]]): Keys of handler_factories to benchmark, all if None.
+        budgets (Sequence[int]): Budgets of the policies.
+        stream_lengths (Sequence[int]): Numbers of timed events.
+        seed (int): Seed of every cell.
+        warmup (Optional[int]): Number of untimed events per cell, 2 * budget + 1000 if None.
+        queries (int): Number of timed get_data calls per cell.
+        repeats (int): Number of runs per cell, combined by best_of.
+        output (Optional[str]): File to write the results to, none if None.
+    Returns:
+        Dict[str, Any]: The environment of the run under "meta" and the cell results under "results".
+    """
+    policy_keys = list(policy_builders) if policy_keys is None else list(policy_keys)
+    handler_keys = list(handler_factories) if handler_keys is None else list(handler_keys)
+    results = []
+    for num_events in stream_lengths:
+        for budget in budgets:
+            for policy_key in policy_keys:
+                for handler_key in handler_keys:
+                    cell = best_of([run_cell(policy_key, handler_key, budget, num_events, seed, warmup, queries)
+                                    for _ in range(repeats)])
+                    results.append(cell)
+                    print(f"{policy_key:>4} {handler_key:>8} budget {budget:>7} events {num_events:>8}: "
+                          f"{cell['add_event'].get('per_second', 0):>10.0f} events/s, "
+                          f"p99 {cell['add_event'].get('p99_us', 0):8.2f} µs, "
+                          f"get_data p50 {cell['get_data'].get('p50_us', 0):10.2f} µs")
+    report = {"meta": _meta(seed), "results": results}
+    _write_report(report, output)
+    return report
+
+
+def _meta(seed: int) -> Dict[str, Any]:
+    """
+    Describe the environment of a run, for the result files.
+    Args:
+        seed (int): Seed of the run.
+    Returns:
+        Dict[str, Any]: The format version, creation time, commit, Python version, platform, CPU count and seed.
+    """
+    return {
+        "format_version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+    }
+
+
+def _write_report(report: Dict[str, Any], output: Optional[str]) -> None:
+    """
+    Write a report as JSON.
+    Args:
+        report (Dict[str, Any]): The report.
+        output (Optional[str]): File to write the report to, none if None.
+    """
+    if output is not None:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def run_sharded(policy_key: str = "SW", handler_key: str = "trace", budget: int = 1000, num_events: int = 100_000,
+                shard_counts: Sequence[int] = SHARD_COUNTS, seed: int = 0,
+                output: Optional[str] = SHARDED_RESULTS_FILE) -> Dict[str, Any]:
+    """
+    Measure how ingestion throughput scales with ShardedMemoryManager, against a single MemoryManager on the same stream.
+    Every run adds the whole stream with add_events and then calls get_data once, so the sharded runs are only timed
+    once every shard has ingested its events. Each shard gets budget divided by the number of shards. Starting the
+    shard processes is not timed. Speedups above 1 need at least as many free cores as shards.
+    Args:
+        policy_key (str): Key of the policy in policy_builders.
+        handler_key (str): Key of the handler in handler_factories.
+        budget (int): Total budget, split over the shards.
+        num_events (int): Number of timed events.
+        shard_counts (Sequence[int]): Numbers of shards to measure.
+        seed (int): Seed of the stream and of the policies.
+        output (Optional[str]): File to write the results to, none if None.
+    Returns:
+        Dict[str, Any]: The environment of the run under "meta" and one result per shard count under "results",
+            with 0 shards standing for the single manager.
+    """
+    events = list(synthetic_stream(num_events, seed=seed))
+    results = []
+    for num_shards in [0, *shard_counts]:
+        random.seed(seed)
+        if num_shards == 0:
+            manager = MemoryManager(build_policy(policy_key, budget, seed), handler_factories[handler_key]())
+        else:
+            manager = ShardedMemoryManager(functools.partial(build_policy, policy_key, budget // num_shards, seed),
+                                           handler_factories[handler_key], num_shards)
+        try:
+            gc.collect()
+            start = time.perf_counter()
+            manager.add_events(events)
+            summary_size = len(manager.get_data())
+            elapsed = time.perf_counter() - start
+        finally:
+            if num_shards:
+                manager.close()
+        results.append({
+            "policy": policy_key,
+            "handler": handler_key,
+            "budget": budget,
+            "events": num_events,
+            "shards": num_shards,
+            "seconds": elapsed,
+            "per_second": num_events / elapsed,
+            "speedup": results[0]["seconds"] / elapsed if results else 1.0,
+            "summary_events": summary_size,
+        })
+        print(f"{num_shards or 'single':>6} {'shards' if num_shards else 'manager'}: "
+              f"{results[-1]['per_second']:>10.0f} events/s, speedup {results[-1]['speedup']:5.2f}")
+    report = {"meta": _meta(seed), "results": results}
+    _write_report(report, output)
+    return report
+
+
+def compare(baseline_file: str, candidate_file: str, threshold: float = THRESHOLD) -> List[str]:
+    """
+    Compare two result files cell by cell and report the cells where the candidate got slower.
+    A cell regresses when its throughput drops, or its p50, p95 or p99 latency grows, by more than threshold
+    relative to the baseline, for add_event or get_data. Cells present in only one file are skipped.
+    Args:
+        baseline_file (str): Results of the reference run.
+        candidate_file (str): Results of the run to check.
+        threshold (float): Tolerated relative slowdown, e.g. 0.1 for 10%.
+    Returns:
+        List[str]: A description of every regression, empty if there is none.
+    """
+    def load(file: str) -> Dict[tuple, Dict[str, Any]]:
+        with open(file, encoding="utf-8") as f:
+            return {(cell["policy"], cell["handler"], cell["budget"], cell["events"]): cell for cell in json.load(f)["results"]}
+
+    baseline, candidate = load(baseline_file), load(candidate_file)
+    regressions = []
+    for key, new in candidate.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for operation in ("add_event", "get_data"):
+            for metric in COMPARED_METRICS:
+                if metric not in old[operation] or metric not in new[operation]:
+                    continue
+                before, after = old[operation][metric], new[operation][metric]
+                # Throughput regresses when it drops, latencies when they grow
+                slowdown = before / after - 1 if metric == "per_second" else after / before - 1
+                if slowdown > threshold:
+                    regressions.append(f"{key[0]} {key[1]} budget {key[2]} events {key[3]}: {operation} {metric} "
+                                       f"{before:.2f} -> {after:.2f} ({slowdown:+.0%} slower)")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point: run writes a result file, compare checks one against a baseline,
+    and sharded measures the throughput of ShardedMemoryManager.
+    Args:
+        argv (Optional[Sequence[str]]): The arguments, those of the process if None.
+    Returns:
+        int: The exit status, 1 if compare found regressions or sharded fell short of --min-speedup.
+    """
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmark of the memory manager.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the benchmark and write the results as JSON.")
+    run.add_argument("--policies", nargs="+", choices=list(policy_builders))
+    run.add_argument("--handlers", nargs="+", choices=list(handler_factories))
+    run.add_argument("--full", action="store_true",
+                     help=f"Sweep budgets up to {FULL_BUDGETS[-1]} and up to {FULL_STREAM_LENGTHS[-1]} events, for hours.")
+    run.add_argument("--budgets", nargs="+", type=int, help=f"Budgets of the policies, {BUDGETS} by default.")
+    run.add_argument("--events", nargs="+", type=int, help=f"Numbers of timed events, {STREAM_LENGTHS} by default.")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--warmup", type=int, help="Untimed events per cell, 2 * budget + 1000 by default.")
+    run.add_argument("--queries", type=int, default=QUERIES, help="Timed get_data calls per cell.")
+    run.add_argument("--repeats", type=int, default=REPEATS, help="Runs per cell, of which the best is kept.")
+    run.add_argument("--output", default=RESULTS_FILE)
+    sharded = commands.add_parser("sharded", help="Measure the throughput of ShardedMemoryManager against one manager.")
+    sharded.add_argument("--policy", default="SW", choices=list(policy_builders))
+    sharded.add_argument("--handler", default="trace", choices=list(handler_factories))
+    sharded.add_argument("--budget", type=int, default=1000, help="Total budget, split over the shards.")
+    sharded.add_argument("--events", type=int, default=100_000, help="Number of timed events.")
+    sharded.add_argument("--shards", nargs="+", type=int, default=SHARD_COUNTS, help="Numbers of shards to measure.")
+    sharded.add_argument("--seed", type=int, default=0)
+    sharded.add_argument("--min-speedup", type=float,
+                         help="Exit with status 1 if the most shards are less than this many times faster than one manager.")
+    sharded.add_argument("--output", default=SHARDED_RESULTS_FILE)
+    check = commands.add_parser("compare", help="Report regressions of a result file against a baseline.")
+    check.add_argument("baseline")
+    check.add_argument("candidate")
+    check.add_argument("--threshold", type=float, default=THRESHOLD, help="Tolerated relative slowdown.")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        budgets = args.budgets or (FULL_BUDGETS if args.full else BUDGETS)
+        stream_lengths = args.events or (FULL_STREAM_LENGTHS if args.full else STREAM_LENGTHS)
+        run_benchmark(args.policies, args.handlers, budgets, stream_lengths, args.seed, args.warmup, args.queries,
+                      args.repeats, args.output)
+        return 0
+    if args.command == "sharded":
+        report = run_sharded(args.policy, args.handler, args.budget, args.events, args.shards, args.seed, args.output)
+        speedup = report["results"][-1]["speedup"]
+        if args.min_speedup is not None and speedup < args.min_speedup:
+            print(f"Speedup {speedup:.2f} with {args.shards[-1]} shards is below {args.min_speedup:.2f} "
+                  f"on {os.cpu_count()} CPU(s)")
+            return 1
+        return 0
+    regressions = compare(args.baseline, args.candidate, args.threshold)
+    for regression in regressions:
+        print(regression)
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,11 @@
-import copy
 import statistics
 
 from collections import defaultdict
 
 from pybeamline.bevent import BEvent
-from pybeamline.sources import xes_log_source_from_file
 
-from evaluation.shared import policies, observable_units_handlers, EvalData, plot_table, plot_line_chart_multiple_lines, \
-    plot_heatmap
+from evaluation.grid import load_log, run_grid
+from evaluation.shared import EvalData, plot_table, plot_line_chart_multiple_lines, plot_heatmap
 from memory_manager.manager import MemoryManager
 
 
@@ -37,6 +35,37 @@ def extract_variants(traces: dict[str, list[BEvent]]):
 def extract_activities(events: list[BEvent]) -> set[str]:
     return {e.get_event_name() for e in events}
 
+class GroundTruth:
+    """
+    Traces, activities, DFRs and variants of the log prefix seen so far, updated per event,
+    so the log side of the evaluation does not re-extract them from the whole prefix after every event.
+    """
+
+    def __init__(self):
+        self.traces: dict[str, tuple[str, ...]] = {}
+        self.activities: set[str] = set()
+        self.dfrs: set[tuple[str, str]] = set()
+        self.variants: set[tuple[str, ...]] = set()
+        self.variant_counts: dict[tuple[str, ...], int] = {}  # {variant: number of traces}
+
+    def add_event(self, event: BEvent):
+        case_id = event.get_trace_name()
+        activity = event.get_event_name()
+        self.activities.add(activity)
+        old_variant = self.traces.get(case_id, ())
+        if old_variant:
+            self.dfrs.add((old_variant[-1], activity))
+            count = self.variant_counts[old_variant] - 1
+            if count == 0:
+                del self.variant_counts[old_variant]
+                self.variants.discard(old_variant)
+            else:
+                self.variant_counts[old_variant] = count
+        variant = old_variant + (activity,)
+        self.traces[case_id] = variant
+        self.variant_counts[variant] = self.variant_counts.get(variant, 0) + 1
+        self.variants.add(variant)
+
 def calculate_dfr_completeness(current_dfrs: set, base_dfrs: set) -> float:
     return calculate_jaccard_similarity(current_dfrs, base_dfrs)
 
@@ -47,68 +76,60 @@ def calculate_variant_completeness(current_variants: set, base_variants: set) ->
     return calculate_jaccard_similarity(current_variants, base_variants)
 
 def calculate_jaccard_similarity(current: set[str], base: set[str]) -> float:
-    intersection = base.intersection(current)
-    union = base.union(current)
+    # The intersection iterates over the smaller set, the summary's, and the union is only counted,
+    # so the cost does not grow with the log prefix
+    intersection = len(current & base)
+    union = len(current) + len(base) - intersection
     if not union:
         return 1.0
-    return len(intersection) / len(union)
+    return intersection / union
 
-def  eval_event(e: BEvent, data: EvalData, l: list[BEvent], memory_manager: MemoryManager):
+def  eval_event(e: BEvent, data: EvalData, truth: GroundTruth, memory_manager: MemoryManager):
     data.event_counter += 1
     memory_manager.add_event(e)
+    truth.add_event(e)
 
-    log_traces = extract_traces(l[:data.event_counter])
-    manager_traces = extract_traces(memory_manager.get_data())
-
-    log_variants = extract_variants(log_traces)
-    manager_variants = extract_variants(manager_traces)
-    data.variant_completeness.append(calculate_variant_completeness(manager_variants, log_variants))
-
-    log_activities = extract_activities(l[:data.event_counter])
-    manager_activities = extract_activities(memory_manager.get_data())
-    data.activity_completeness.append(calculate_activity_completeness(manager_activities, log_activities))
-
-    log_dfrs = extract_dfrs(log_traces)
-    manager_dfrs = extract_dfrs(manager_traces)
-    data.dfr_completeness.append(calculate_dfr_completeness(manager_dfrs, log_dfrs))
-
-
-def run_eval(file: str, event_num: int, drift_indexes: []):
-    log: list[BEvent] = []
-    xes_log_source_from_file(file).subscribe(lambda x: log.append(x))
-
-    drift_logs = []
-
-    for i in range(len(drift_indexes) - 1):
-        drift_log = log[drift_indexes[i]:drift_indexes[i + 1]]
-        drift_log = drift_log[:event_num]
-        drift_logs.append(drift_log)
+    # The views are maintained on every update, so the summary is only converted back for handlers
+    # whose relations and variants span several units
+    if memory_manager.handler.holds_cases:
+        manager_variants = memory_manager.get_variants().keys()
+        manager_dfrs = memory_manager.get_dfg().keys()
+    else:
+        manager_traces = extract_traces(memory_manager.get_data())
+        manager_variants = extract_variants(manager_traces)
+        manager_dfrs = extract_dfrs(manager_traces)
+    data.variant_completeness.append(calculate_variant_completeness(manager_variants, truth.variants))
 
-    log = log[:event_num]
+    manager_activities = memory_manager.get_activities()
+    data.activity_completeness.append(calculate_activity_completeness(manager_activities, truth.activities))
 
-    steady_result = {}
+    data.dfr_completeness.append(calculate_dfr_completeness(manager_dfrs, truth.dfrs))
 
-    for policy_key in policies:
-        steady_result[policy_key] = {}
-        for ouh_key in observable_units_handlers:
-            eval_data = EvalData()
-            print("Test started. Policy: ", policy_key, " Observable uint: ", ouh_key)
-            policy_copy = copy.deepcopy(policies[policy_key])
-            mm = MemoryManager(policy_copy, observable_units_handlers[ouh_key])
-            if not drift_indexes:
-                for event in log:
-                    eval_event(event, eval_data, log, mm)
-            else:
-                for drift_log in drift_logs:
-                    eval_data.event_counter = 0
-                    for event in drift_log:
-                        eval_event(event, eval_data, drift_log, mm)
-            steady_result[policy_key][ouh_key] = eval_data
 
-    columns = list(observable_units_handlers.keys())
+def eval_cell(mm: MemoryManager, file: str, event_num: int, drift_indexes: []) -> EvalData:
+    log = load_log(file)
+    eval_data = EvalData()
+    if not drift_indexes:
+        truth = GroundTruth()
+        for event in log[:event_num]:
+            eval_event(event, eval_data, truth, mm)
+    else:
+        for i in range(len(drift_indexes) - 1):
+            drift_log = log[drift_indexes[i]:drift_indexes[i + 1]][:event_num]
+            eval_data.event_counter = 0
+            truth = GroundTruth()
+            for event in drift_log:
+                eval_event(event, eval_data, truth, mm)
+    return eval_data
+
+def run_eval(file: str, event_num: int, drift_indexes: [], max_workers: int = None, seed: int = 0):
+    steady_result = run_grid(eval_cell, (file, event_num, drift_indexes), max_workers=max_workers, seed=seed,
+                             track_views=True)
+
+    columns = list(next(iter(steady_result.values())).keys())
     num_cell_dfr = []
     num_cell_variant = []
-    rows = list(policies.keys())
+    rows = list(steady_result.keys())
     cell_text = []
     for policy_key in rows:
         row = []
@@ -150,7 +171,8 @@ def run_eval(file: str, event_num: int, drift_indexes: []):
         plot_line_chart_multiple_lines(data_pack_variants, "Variant completeness " + policy_key,  path = path)
         plot_line_chart_multiple_lines(data_pack_activities, "Activity completeness " + policy_key,  path = path)
 
-run_eval("Log_Supply_steady.xes", 1000, [])
+if __name__ == "__main__":
+    run_eval("Log_Supply_steady.xes", 1000, [])
 
 
 
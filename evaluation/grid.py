@@ -0,0 +1,95 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence, TypeVar
+from zlib import crc32
+
+from evaluation.shared import policy_factories, handler_factories
+from evaluation.xes_cache import CachedXesLog, load_xes
+from memory_manager.manager import MemoryManager
+
+R = TypeVar("R")
+
+
+@lru_cache(maxsize=4)
+def load_log(file: str, event_num: Optional[int] = None) -> CachedXesLog:
+    """
+    Open an XES log through its columnar cache, once per worker process.
+    Args:
+        file (str): Path of the XES log.
+        event_num (Optional[int]): Number of leading events to keep, all if None.
+    Returns:
+        CachedXesLog: The events, replayed lazily.
+    """
+    return load_xes(file)[:event_num]
+
+
+def cell_seed(seed: int, policy_key: str, handler_key: str) -> int:
+    """
+    Derive the seed of a grid cell, so every cell is reproducible whatever worker runs it.
+    Args:
+        seed (int): Seed of the whole grid.
+        policy_key (str): Key of the cell's policy in policy_factories.
+        handler_key (str): Key of the cell's handler in handler_factories.
+    Returns:
+        int: The seed of the cell.
+    """
+    return crc32(f"{seed}/{policy_key}/{handler_key}".encode())
+
+
+def _run_cell(cell: Callable[..., R], policy_key: str, handler_key: str, seed: int, args: tuple,
+              track_views: bool) -> R:
+    """
+    Build the memory manager of a cell from the factories and run the cell on it, in a worker process.
+    Args:
+        cell (Callable[..., R]): Module level function taking the memory manager followed by args.
+        policy_key (str): Key of the cell's policy in policy_factories.
+        handler_key (str): Key of the cell's handler in handler_factories.
+        seed (int): Seed of the cell.
+        args (tuple): Further arguments of the cell.
+        track_views (bool): Whether the memory manager maintains its summary views.
+    Returns:
+        R: The result of the cell.
+    """
+    random.seed(seed)
+    mm = MemoryManager(policy_factories[policy_key](seed), handler_factories[handler_key](), track_views=track_views)
+    print("Test started. Policy: ", policy_key, " Observable unit: ", handler_key)
+    return cell(mm, *args)
+
+
+def run_grid(cell: Callable[..., R], args: tuple = (), policy_keys: Optional[Sequence[str]] = None,
+             handler_keys: Optional[Sequence[str]] = None, max_workers: Optional[int] = None,
+             seed: int = 0, track_views: bool = False) -> Dict[str, Dict[str, R]]:
+    """
+    Run an evaluation cell for every (policy, handler) pair on a process pool.
+    Cells are independent, so a sweep takes about as long as its slowest cell once there are enough cores.
+    The cell function and args are sent to the workers, so they must be picklable: pass log file names
+    rather than events and read them with load_log.
+    Args:
+        cell (Callable[..., R]): Module level function taking a fresh memory manager followed by args.
+        args (tuple): Further arguments of every cell.
+        policy_keys (Optional[Sequence[str]]): Keys of policy_factories to evaluate, all if None.
+        handler_keys (Optional[Sequence[str]]): Keys of handler_factories to evaluate, all if None.
+        max_workers (Optional[int]): Number of worker processes, one per CPU if None.
+        seed (int): Seed of the grid, from which every cell derives its own.
+        track_views (bool): Whether the memory managers maintain their summary views.
+    Returns:
+        Dict[str, Dict[str, R]]: The results, as {policy key: {handler key: result}} in the order of the keys.
+    """
+    policy_keys = list(policy_factories) if policy_keys is None else list(policy_keys)
+    handler_keys = list(handler_factories) if handler_keys is None else list(handler_keys)
+    max_workers = max_workers or max(1, min(os.cpu_count() or 1, len(policy_keys) * len(handler_keys)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            policy_key: {
+                handler_key: executor.submit(_run_cell, cell, policy_key, handler_key,
+                                             cell_seed(seed, policy_key, handler_key), args, track_views)
+                for handler_key in handler_keys
+            }
+            for policy_key in policy_keys
+        }
+        return {
+            policy_key: {handler_key: future.result() for handler_key, future in row.items()}
+            for policy_key, row in futures.items()
+        }
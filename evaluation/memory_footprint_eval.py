@@ -1,50 +1,52 @@
-from typing import List
-import copy
-
 from pybeamline.bevent import BEvent
-from pybeamline.sources import xes_log_source_from_file
 from pympler import asizeof
 
-from evaluation.shared import EvalData, policies, observable_units_handlers, plot_heatmap
+from evaluation.grid import load_log, run_grid
+from evaluation.shared import EvalData, plot_heatmap
 from memory_manager.manager import MemoryManager
 
 
-def handle(e: BEvent, data: EvalData):
+def handle(e: BEvent, data: EvalData, mm: MemoryManager, validate_every: int):
     data.event_counter += 1
     mm.add_event(e)
-    data.memory_footprints.append(asizeof.asizeof(mm))
-
-result = {}
-log: List[BEvent] = []
-xes_log_source_from_file("Log_Supply_steady.xes").subscribe(lambda x: log.append(x))
-
-log = log[:1000]
-for policy_key in policies:
-    result[policy_key] = {}
-    for ouh_key in observable_units_handlers:
-        eval_data = EvalData()
-        print("Memory footprint test started. Policy -> ", policy_key, ". Observable Uint -> ", ouh_key)
-        policy_copy = copy.deepcopy(policies[policy_key])
-        mm = MemoryManager(policy_copy, observable_units_handlers[ouh_key])
-        for event in log:
-            handle(event, eval_data)
-        print("Memory footprint test ended. Policy -> ", policy_key, ". Observable Uint -> ", ouh_key)
-        result[policy_key][ouh_key] = eval_data
-
-mf_columns = list(observable_units_handlers.keys())
-mf_rows = list(policies.keys())
-
-cell_text = []
-cell_num = []
-for policy_key in mf_rows:
-    row = []
-    num_row = []
-    for ouh_key in mf_columns:
-        eval_data = result[policy_key][ouh_key]
-        avg_mem = eval_data.avg_memory_footprint() if eval_data.memory_footprints else 0
-        num_row.append(avg_mem/1000)
-        row.append(f"{avg_mem/1000:.0f}")
-    cell_text.append(row)
-    cell_num.append(num_row)
-
-plot_heatmap("Average Memory footprint (kB)", cell_num, mf_rows, mf_columns)
+    # The incrementally maintained estimate is O(1) per event; asizeof traverses the whole summary,
+    # so it only runs on a sample of the events to validate the estimate
+    data.memory_footprints.append(mm.estimated_bytes())
+    if validate_every and data.event_counter % validate_every == 0:
+        data.measured_footprints.append((data.event_counter, asizeof.asizeof(mm)))
+
+def eval_cell(mm: MemoryManager, file: str, event_num: int, validate_every: int = 100) -> EvalData:
+    eval_data = EvalData()
+    for event in load_log(file)[:event_num]:
+        handle(event, eval_data, mm, validate_every)
+    return eval_data
+
+def run_eval(file: str, event_num: int, validate_every: int = 100, max_workers: int = None, seed: int = 0):
+    result = run_grid(eval_cell, (file, event_num, validate_every), max_workers=max_workers, seed=seed)
+
+    mf_columns = list(next(iter(result.values())).keys())
+    mf_rows = list(result.keys())
+
+    cell_text = []
+    cell_num = []
+    error_num = []
+    for policy_key in mf_rows:
+        row = []
+        num_row = []
+        error_row = []
+        for ouh_key in mf_columns:
+            eval_data = result[policy_key][ouh_key]
+            avg_mem = eval_data.avg_memory_footprint() if eval_data.memory_footprints else 0
+            num_row.append(avg_mem/1000)
+            row.append(f"{avg_mem/1000:.0f}")
+            error_row.append(eval_data.max_footprint_error())
+        cell_text.append(row)
+        cell_num.append(num_row)
+        error_num.append(error_row)
+
+    plot_heatmap("Average Memory footprint (kB)", cell_num, mf_rows, mf_columns)
+    if validate_every:
+        plot_heatmap("Maximum relative error of the estimated footprint", error_num, mf_rows, mf_columns)
+
+if __name__ == "__main__":
+    run_eval("Log_Supply_steady.xes", 1000)
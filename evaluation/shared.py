@@ -4,6 +4,7 @@ from memory_manager.observable_unit_tools.handlers.event_observable_unit_handler
 from memory_manager.observable_unit_tools.handlers.trace_observable_unit_handler import TraceObservableUnitHandler
 from memory_manager.observable_unit_tools.handlers.variant_observable_unit_handler import VariantObservableUnitHandler
 from memory_manager.policies.exponential_decay_counting_policy import ExponentialDecayCountingPolicy
+from memory_manager.policies.lossy_count_policy import LossyCountPolicy
 from memory_manager.policies.lossy_count_with_budget_policy import LossyCountWithBudgetPolicy
 from memory_manager.policies.reservoir_sampling_policy import ReservoirSamplingPolicy
 from memory_manager.policies.sliding_window_policy import SlidingWindowPolicy
@@ -23,6 +24,7 @@ class EvalData:
         self.event_counter = 0
         self.processing_times = []
         self.memory_footprints = []
+        self.measured_footprints = []  # (event number, asizeof) on the validation sample
         self.dfr_completeness = []
         self.variant_completeness = []
         self.activity_completeness = []
@@ -31,6 +33,7 @@ class EvalData:
         self.event_counter = 0
         self.processing_times = []
         self.memory_footprints = []
+        self.measured_footprints = []
         self.dfr_completeness = []
 
     def avg_processing_time(self):
@@ -39,6 +42,11 @@ class EvalData:
     def avg_memory_footprint(self):
         return sum(self.memory_footprints) / len(self.memory_footprints)
 
+    def max_footprint_error(self):
+        # Largest relative error of the estimated footprint against asizeof on the validation sample
+        return max((abs(self.memory_footprints[n - 1] - measured) / measured
+                    for n, measured in self.measured_footprints), default=0.0)
+
 def plot_line_chart(data: List[float], title: str = "Line Chart", xlabel: str = "Events", ylabel: str = "Completeness", fig_name = "fig.png"):
     plt.figure(figsize=(16, 6))
     plt.plot(data, marker='', linewidth=1.5)
@@ -103,31 +111,39 @@ def plot_heatmap(title: str, data: list, rows: list, columns: list):
     os.makedirs("evaluation/results", exist_ok=True)
     plt.savefig("evaluation/results/" + table_name, dpi=300)
 
-policies = {
-
-    "SW20": SlidingWindowPolicy(20),
-    "EDC20": ExponentialDecayCountingPolicy(20),
-    "LCB20": LossyCountWithBudgetPolicy(20),
-    "RS20": ReservoirSamplingPolicy(20),
-    "TW20": TumblingWindowPolicy(20),
-
-    "SW10": SlidingWindowPolicy(10),
-    "EDC10": ExponentialDecayCountingPolicy(10),
-    "LCB10": LossyCountWithBudgetPolicy(10),
-    "RS10": ReservoirSamplingPolicy(10),
-    "TW10": TumblingWindowPolicy(10),
+# Factories taking a seed, so that every evaluation cell builds its own policy instead of deep-copying a shared one
+policy_factories = {
+
+    "SW20": lambda seed: SlidingWindowPolicy(20),
+    "EDC20": lambda seed: ExponentialDecayCountingPolicy(20),
+    "LCB20": lambda seed: LossyCountWithBudgetPolicy(20),
+    "LC20": lambda seed: LossyCountPolicy(1 / 20),
+    "RS20": lambda seed: ReservoirSamplingPolicy(20, seed),
+    "TW20": lambda seed: TumblingWindowPolicy(20),
+
+    "SW10": lambda seed: SlidingWindowPolicy(10),
+    "EDC10": lambda seed: ExponentialDecayCountingPolicy(10),
+    "LCB10": lambda seed: LossyCountWithBudgetPolicy(10),
+    "LC10": lambda seed: LossyCountPolicy(1 / 10),
+    "RS10": lambda seed: ReservoirSamplingPolicy(10, seed),
+    "TW10": lambda seed: TumblingWindowPolicy(10),
+
+    "SW5": lambda seed: SlidingWindowPolicy(5),
+    "EDC5": lambda seed: ExponentialDecayCountingPolicy(5),
+    "LCB5": lambda seed: LossyCountWithBudgetPolicy(5),
+    "LC5": lambda seed: LossyCountPolicy(1 / 5),
+    "RS5": lambda seed: ReservoirSamplingPolicy(5, seed),
+    "TW5": lambda seed: TumblingWindowPolicy(5),
 
-    "SW5": SlidingWindowPolicy(5),
-    "EDC5": ExponentialDecayCountingPolicy(5),
-    "LCB5": LossyCountWithBudgetPolicy(5),
-    "RS5": ReservoirSamplingPolicy(5),
-    "TW5": TumblingWindowPolicy(5),
+}
 
+handler_factories = {
+    "event": EventObservableUnitHandler,
+    "DFR": DfrObservableUnitHandler,
+    "variant": VariantObservableUnitHandler,
+    "trace": TraceObservableUnitHandler,
 }
 
-observable_units_handlers = {
-    "event": EventObservableUnitHandler(),
-    "DFR": DfrObservableUnitHandler(),
-    "variant": VariantObservableUnitHandler(),
-    "trace": TraceObservableUnitHandler(),
-}
\ No newline at end of file
+policies = {key: factory(None) for key, factory in policy_factories.items()}
+
+observable_units_handlers = {key: factory() for key, factory in handler_factories.items()}
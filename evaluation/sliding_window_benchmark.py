@@ -0,0 +1,65 @@
+import gc
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pybeamline.bevent import BEvent
+
+from memory_manager.manager import MemoryManager
+from memory_manager.observable_unit_tools.handlers.event_observable_unit_handler import EventObservableUnitHandler
+from memory_manager.observable_unit_tools.handlers.trace_observable_unit_handler import TraceObservableUnitHandler
+from memory_manager.policies.sliding_window_policy import SlidingWindowPolicy
+
+WINDOW_SIZES = [10, 100, 1000, 10000, 100000]
+MEASURED_EVENTS = 20000
+
+
+def synthetic_events(num_events: int, num_cases: int, seed: int = 0) -> List[BEvent]:
+    """
+    Generate a reproducible stream of events interleaving a fixed number of cases.
+    Args:
+        num_events (int): Number of events to generate.
+        num_cases (int): Number of distinct case IDs to spread the events over.
+        seed (int): Seed of the random generator.
+    Returns:
+        List[BEvent]: The generated events.
+    """
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    activities = ["a", "b", "c", "d", "e", "f"]
+    return [
+        BEvent(rng.choice(activities), str(rng.randrange(num_cases)), "synthetic", start + timedelta(seconds=i))
+        for i in range(num_events)
+    ]
+
+
+def measure(window_size: int, handler_class) -> float:
+    """
+    Fill a sliding window and return the mean add_event time once the window is full.
+    Args:
+        window_size (int): The window size under test.
+        handler_class: The observable unit handler class to use.
+    Returns:
+        float: Mean seconds per event.
+    """
+    mm = MemoryManager(SlidingWindowPolicy(window_size), handler_class())
+    # Enough cases that the window fills with units and keeps evicting.
+    events = synthetic_events(window_size + MEASURED_EVENTS, num_cases=2 * window_size)
+    for event in events[:window_size]:
+        mm.add_event(event)
+    gc.collect()
+    start_time = time.perf_counter()
+    for event in events[window_size:]:
+        mm.add_event(event)
+    return (time.perf_counter() - start_time) / MEASURED_EVENTS
+
+
+if __name__ == "__main__":
+    for handler_class in (EventObservableUnitHandler, TraceObservableUnitHandler):
+        print("Sliding window per-event cost, handler:", handler_class.__name__)
+        results = [measure(window_size, handler_class) for window_size in WINDOW_SIZES]
+        for window_size, result in zip(WINDOW_SIZES, results):
+            print(f"  window {window_size:>7}: {result * 1e6:8.2f} µs/event")
+        print(f"  spread (max/min): {max(results) / min(results):.2f}, mean {statistics.mean(results) * 1e6:.2f} µs")
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+from pybeamline.bevent import BEvent
+
+from memory_manager.tools.symbol_table import SymbolTable
+
+FORMAT_VERSION = 1  # Part of the cache key, bump it when the layout changes
+DEFAULT_CACHE_DIR = ".xes_cache"
+PROCESS_NAME = "log-file"  # Process name pybeamline's XES source gives every event
+NAME_KEY = "concept:name"
+TIMESTAMP_KEY = "time:timestamp"
+NO_TIME = -(2 ** 63)  # Stored in place of a missing timestamp
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _local_name(tag: str) -> str:
+    """
+    Strip the XML namespace from a tag.
+    Args:
+        tag (str): The tag, possibly as {namespace}name.
+    Returns:
+        str: The name.
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_value(kind: str, value: str) -> Any:
+    """
+    Convert the value of an XES attribute to the Python type of its XES type.
+    Args:
+        kind (str): The XES type, i.e. the tag of the attribute element.
+        value (str): The value as written in the log.
+    Returns:
+        Any: The converted value.
+    """
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if kind == "boolean":
+        return value.lower() == "true"
+    if kind == "date":
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _encode_time(time: Optional[datetime]) -> Tuple[int, int]:
+    """
+    Encode a timestamp as microseconds since the epoch in UTC and UTC offset in minutes.
+    Timestamps without time zone are taken as UTC, as pm4py does when pybeamline reads a log.
+    Args:
+        time (Optional[datetime]): The timestamp.
+    Returns:
+        Tuple[int, int]: The microseconds and the offset.
+    """
+    if time is None:
+        return NO_TIME, 0
+    offset = time.utcoffset() or timedelta(0)
+    return (time.replace(tzinfo=None) - offset - EPOCH) // ONE_MICROSECOND, offset // timedelta(minutes=1)
+
+
+def _decode_time(micros: int, offset: int) -> Optional[datetime]:
+    """
+    Rebuild a timestamp encoded by _encode_time.
+    Args:
+        micros (int): Microseconds since the epoch.
+        offset (int): UTC offset in minutes.
+    Returns:
+        Optional[datetime]: The timestamp, in its original time zone.
+    """
+    if micros == NO_TIME:
+        return None
+    zone = timezone.utc if offset == 0 else timezone(timedelta(minutes=offset))
+    return (EPOCH + (micros + offset * 60_000_000) * ONE_MICROSECOND).replace(tzinfo=zone)
+
+
+def file_digest(file: str) -> str:
+    """
+    Hash the content of a file, reading it in chunks.
+    Args:
+        file (str): Path of the file.
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_cache(file: str, directory: str) -> None:
+    """
+    Parse an XES log with iterparse and write it to a directory as columns, sorted by timestamp like
+    pybeamline's XES source replays it. Only the events of the current trace are held as elements,
+    everything else goes into compact arrays and symbol tables.
+    Columns are .npy files: activity and case (indices into the activity and case tables), time
+    (microseconds since the epoch), offset (UTC offset in minutes) and one per other event attribute
+    (indices into its value table, -1 where the event lacks it). The tables go to tables.json, with
+    attribute values as (XES type, value) and the trace attributes of every case.
+    Args:
+        file (str): Path of the XES log.
+        directory (str): Directory to write, replaced atomically once complete.
+    """
+    activities = SymbolTable()
+    cases = SymbolTable()
+    activity = array('i')
+    case = array('i')
+    times = array('q')
+    offsets = array('i')
+    attribute_columns: Dict[str, array] = {}  # {attribute key: value symbol per event}
+    attribute_values: Dict[str, SymbolTable] = {}  # {attribute key: (XES type, value) symbols}
+    trace_attributes: List[Dict[str, Tuple[str, str]]] = []  # Per case symbol
+    trace_start = 0  # Position of the first event of the current trace
+    depth = 0
+    root = None
+    for event, element in iterparse(file, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = element
+            continue
+        depth -= 1
+        name = _local_name(element.tag)
+        if name == "event" and depth == 2:
+            time = None
+            for child in element:
+                key, value = child.get("key"), child.get("value")
+                kind = _local_name(child.tag)
+                if key == NAME_KEY:
+                    activity.append(activities.intern(value))
+                elif key == TIMESTAMP_KEY:
+                    time = _parse_value(kind, value)
+                elif key is not None and value is not None:
+                    column = attribute_columns.get(key)
+                    if column is None:
+                        column = attribute_columns[key] = array('i', [-1]) * len(times)
+                        attribute_values[key] = SymbolTable()
+                    column.append(attribute_values[key].intern((kind, value)))
+            if len(activity) == len(times):
+                activity.append(activities.intern(None))
+            micros, offset = _encode_time(time)
+            times.append(micros)
+            offsets.append(offset)
+            for column in attribute_columns.values():
+                if len(column) < len(times):
+                    column.append(-1)
+            element.clear()
+        elif name == "trace" and depth == 1:
+            attributes = {child.get("key"): (_local_name(child.tag), child.get("value"))
+                          for child in element if child.get("key") is not None}
+            case_id = attributes.get(NAME_KEY, (None, None))[1]
+            symbol = cases.intern(case_id)
+            if symbol == len(trace_attributes):
+                trace_attributes.append({key: value for key, value in attributes.items() if key != NAME_KEY})
+            case.extend([symbol] * (len(times) - trace_start))
+            trace_start = len(times)
+            root.clear()
+
+    time_column = np.frombuffer(times, dtype=np.int64) if times else np.zeros(0, dtype=np.int64)
+    # Stable sort by time, events without a timestamp last
+    order = np.lexsort((time_column, time_column == NO_TIME))
+    temporary = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(directory))
+    try:
+        np.save(os.path.join(temporary, "activity.npy"), np.asarray(activity, dtype=np.int32)[order])
+        np.save(os.path.join(temporary, "case.npy"), np.asarray(case, dtype=np.int32)[order])
+        np.save(os.path.join(temporary, "time.npy"), time_column[order])
+        np.save(os.path.join(temporary, "offset.npy"), np.asarray(offsets, dtype=np.int16)[order])
+        keys = list(attribute_columns)
+        for i, key in enumerate(keys):
+            np.save(os.path.join(temporary, f"attribute_{i}.npy"), np.asarray(attribute_columns[key], dtype=np.int32)[order])
+        with open(os.path.join(temporary, "tables.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "activities": list(activities.values),
+                "cases": list(cases.values),
+                "attributes": [[key, list(attribute_values[key].values)] for key in keys],
+                "trace_attributes": trace_attributes,
+            }, f)
+        os.replace(temporary, directory)
+    except BaseException:
+        shutil.rmtree(temporary, ignore_errors=True)
+        raise
+
+
+class XesCache:
+    """
+    Columns of a cached XES log, memory-mapped from disk. Events are only rebuilt when they are read.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Open a cache directory written by build_cache.
+        Args:
+            directory (str): The cache directory.
+        """
+        def column(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, name), mmap_mode="r")
+
+        with open(os.path.join(directory, "tables.json"), encoding="utf-8") as f:
+            tables = json.load(f)
+        self.activities: List[Optional[str]] = tables["activities"]
+        self.cases: List[Optional[str]] = tables["cases"]
+        self.trace_attributes: List[Dict[str, Any]] = [
+            {key: _parse_value(kind, value) for key, (kind, value) in attributes.items()}
+            for attributes in tables["trace_attributes"]
+        ]
+        self.attributes: List[Tuple[str, List[Tuple[str, str]], np.ndarray]] = [  # (key, values, column)
+            (key, values, column(f"attribute_{i}.npy")) for i, (key, values) in enumerate(tables["attributes"])
+        ]
+        self.activity: np.ndarray = column("activity.npy")
+        self.case: np.ndarray = column("case.npy")
+        self.time: np.ndarray = column("time.npy")
+        self.offset: np.ndarray = column("offset.npy")
+
+    def __len__(self) -> int:
+        """
+        Return the number of events in the log.
+        Returns:
+            int: The number of events.
+        """
+        return len(self.time)
+
+    def event(self, position: int) -> BEvent:
+        """
+        Rebuild an event.
+        Args:
+            position (int): Position of the event in the replay order.
+        Returns:
+            BEvent: The event, with its other event attributes and its trace attributes.
+        """
+        case_symbol = int(self.case[position])
+        event = BEvent(self.activities[self.activity[position]], self.cases[case_symbol], PROCESS_NAME,
+                       _decode_time(int(self.time[position]), int(self.offset[position])))
+        for key, values, column in self.attributes:
+            symbol = column[position]
+            if symbol >= 0:
+                event.event_attributes[key] = _parse_value(*values[symbol])
+        event.trace_attributes.update(self.trace_attributes[case_symbol])
+        return event
+
+
+class CachedXesLog(Sequence):
+    """
+    Read-only sequence of the events of a cached XES log, in replay order.
+    Events are rebuilt from the memory-mapped columns on access, so the log is never materialised;
+    slicing returns another lazy view.
+    """
+
+    def __init__(self, cache: XesCache, positions: Optional[range] = None) -> None:
+        """
+        Initialize a view on a cache.
+        Args:
+            cache (XesCache): The cached log.
+            positions (Optional[range]): Positions of the events in the view, the whole log if None.
+        """
+        self.cache: XesCache = cache
+        self.positions: range = range(len(cache)) if positions is None else positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[BEvent, "CachedXesLog"]:
+        if isinstance(index, slice):
+            return CachedXesLog(self.cache, self.positions[index])
+        return self.cache.event(self.positions[index])
+
+    def __iter__(self) -> Iterator[BEvent]:
+        event = self.cache.event
+        for position in self.positions:
+            yield event(position)
+
+
+def load_xes(file: str, cache_dir: str = DEFAULT_CACHE_DIR) -> CachedXesLog:
+    """
+    Open an XES log through its columnar cache, building the cache on first use.
+    The cache is keyed by the SHA-256 of the file, so a changed log gets a new cache.
+    Args:
+        file (str): Path of the XES log.
+        cache_dir (str): Directory holding the caches.
+    Returns:
+        CachedXesLog: The events of the log, replayed lazily in timestamp order.
+    """
+    directory = os.path.join(cache_dir, f"{file_digest(file)}-v{FORMAT_VERSION}")
+    if not os.path.isdir(directory):
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            build_cache(file, directory)
+        except OSError:
+            if not os.path.isdir(directory):  # Another process may have built it concurrently
+                raise
+    return CachedXesLog(XesCache(directory))
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from pybeamline.bevent import BEvent
+
+from memory_manager.manager import MemoryManager
+from memory_manager.snapshot_manager import SnapshotMemoryManager
+
+
+class AsyncMemoryManager:
+    """
+    asyncio front-end for a MemoryManager, for asynchronous event sources.
+
+    Producers put events into a bounded queue. A consumer task takes them off in micro-batches and feeds them
+    to the wrapped manager's add_events on a single worker thread, so the event loop and the producers are never
+    blocked by summarisation. The worker publishes an immutable snapshot of the summary every publish_every events,
+    after every batch that empties the queue and when stopping, and get_data serves the latest one without waiting
+    for the worker, so reads never hold up ingestion. Snapshots only lag behind while events keep arriving,
+    by at most publish_every events, and get_metrics reports by how many.
+
+    When the queue is full, put waits and try_put refuses the event, which is how producers see backpressure.
+    If ingestion fails, the consumer stops and put and try_put raise its exception instead of waiting forever.
+    """
+
+    def __init__(self, manager: MemoryManager, max_queue_size: int = 10000, batch_size: int = 256, publish_every: int = 1024) -> None:
+        """
+        Initialize the front-end. The consumer starts with start or when entering the async context.
+        Args:
+            manager (MemoryManager): The manager to feed; it must only be used through this front-end.
+            max_queue_size (int): Maximum number of events waiting in the queue.
+            batch_size (int): Maximum number of events passed to the manager at once.
+            publish_every (int): Maximum number of events ingested between two snapshots served by get_data
+                while the queue does not run empty.
+        Raises:
+            ValueError: If publish_every is smaller than 1.
+        """
+        self.manager: MemoryManager = manager
+        self.snapshots = SnapshotMemoryManager(manager, publish_every)
+        self.max_queue_size: int = max_queue_size
+        self.batch_size: int = batch_size
+        self.queue: asyncio.Queue[Optional[Tuple[BEvent, float]]] = asyncio.Queue(max_queue_size)  # (event, enqueue time), None stops the consumer
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.consumer: Optional[asyncio.Task] = None
+        self.events_processed: int = 0
+        self.events_rejected: int = 0
+        self.lag: float = 0.0  # Seconds between enqueueing and processing the oldest event of the last batch
+
+    def start(self) -> None:
+        """
+        Start the consumer task on the running event loop.
+        """
+        if self.consumer is None:
+            self.consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    async def stop(self) -> None:
+        """
+        Process all queued events, then stop the consumer task and the worker thread.
+        Raises:
+            Exception: Whatever the manager raised while ingesting, if the consumer failed.
+        """
+        if self.consumer is not None:
+            if not self.consumer.done():
+                await self.queue.put(None)
+            consumer, self.consumer = self.consumer, None
+            try:
+                await consumer
+            finally:
+                self.executor.shutdown(wait=True)
+
+    async def put(self, event: BEvent) -> None:
+        """
+        Enqueue an event, waiting while the queue is full.
+        Args:
+            event (BEvent): The event to add.
+        Raises:
+            Exception: Whatever the manager raised while ingesting, if the consumer failed.
+            RuntimeError: If the consumer stopped while the queue is full.
+        """
+        self._check_consumer()
+        item = (event, time.monotonic())
+        if self.consumer is None or not self.queue.full():
+            await self.queue.put(item)
+            return
+        putter = asyncio.ensure_future(self.queue.put(item))
+        await asyncio.wait((putter, self.consumer), return_when=asyncio.FIRST_COMPLETED)
+        if not putter.done():
+            putter.cancel()
+            self._check_consumer()
+
+    def try_put(self, event: BEvent) -> bool:
+        """
+        Enqueue an event if there is room, for producers that cannot wait, such as synchronous callbacks.
+        Args:
+            event (BEvent): The event to add.
+        Returns:
+            bool: True if the event was enqueued, False if the queue is full.
+        Raises:
+            Exception: Whatever the manager raised while ingesting, if the consumer failed.
+            RuntimeError: If the consumer has stopped.
+        """
+        self._check_consumer()
+        try:
+            self.queue.put_nowait((event, time.monotonic()))
+            return True
+        except asyncio.QueueFull:
+            self.events_rejected += 1
+            return False
+
+    async def get_data(self) -> List[BEvent]:
+        """
+        Retrieve the managed events of the latest snapshot, which is current once the queue has run empty.
+        Events ingested since the last publication and events still in the queue are not included.
+        Returns:
+            List[BEvent]: The list of managed events.
+        """
+        return self.snapshots.get_data()
+
+    def queue_depth(self) -> int:
+        """
+        Return the number of events waiting in the queue.
+        Returns:
+            int: The queue depth.
+        """
+        return self.queue.qsize()
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Return the ingestion metrics.
+        Returns:
+            Dict[str, float]: Queue depth, queue capacity, processed and rejected event counts, lag in seconds,
+                and the number of ingested events the snapshot served by get_data does not include yet.
+        """
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "events_processed": self.events_processed,
+            "events_rejected": self.events_rejected,
+            "lag": self.lag,
+            "snapshot_lag": self.snapshots.event_count - self.snapshots.get_snapshot().event_count,
+        }
+
+    async def _consume(self) -> None:
+        """
+        Take events off the queue in micro-batches and pass them to the manager, until stopped.
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self.queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size or self.queue.empty():
+                    break
+                item = self.queue.get_nowait()
+            stopping = item is None
+            drained = stopping or self.queue.empty()
+            try:
+                if batch:
+                    await loop.run_in_executor(self.executor, self.snapshots.add_events, [event for event, _ in batch])
+                    self.events_processed += len(batch)
+                    self.lag = time.monotonic() - batch[0][1]
+                # Publishing is cheap, so reads are brought up to date whenever ingestion catches up with the producers
+                if drained and self.snapshots.pending:
+                    await loop.run_in_executor(self.executor, self.snapshots.publish)
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self.queue.task_done()
+
+    def _check_consumer(self) -> None:
+        """
+        Raise if the consumer task has finished while the front-end is still running.
+        Raises:
+            Exception: Whatever the manager raised while ingesting, if the consumer failed.
+            RuntimeError: If the consumer stopped without failing.
+        """
+        if self.consumer is not None and self.consumer.done():
+            exception = self.consumer.exception()
+            if exception is not None:
+                raise exception
+            raise RuntimeError("The consumer has stopped.")
+
+    async def __aenter__(self) -> "AsyncMemoryManager":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.stop()
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+from pybeamline.bevent import BEvent
+
+from memory_manager.tools.symbol_table import SymbolTable
+
+MODES = ("count", "decay", "window")
+RESCALE_THRESHOLD = 1e100  # Fold the decay scale into the matrix once it grows past this value
+
+
+class DfgCountMatrix:
+    """
+    Summary of an event stream as a directly-follows graph, for when only directly-follows frequencies are needed.
+    Instead of storing observable units under a policy, it interns activities as row and column indices of a dense
+    NumPy count matrix, so memory only depends on the number of activities and every event is an O(1) update.
+
+    Three modes are supported:
+    - "count": exact frequency of every directly-follows relation.
+    - "decay": every relation observed k relations ago counts decay^k. Counts are stored scaled by a running
+      factor (forward decay), so an update touches one cell and the whole matrix is only rescaled, vectorized,
+      once the factor gets large.
+    - "window": frequencies over the last window_size relations, kept in a ring buffer of matrix cells.
+    """
+
+    def __init__(self, mode: str = "count", decay: float = 0.9, window_size: int = 1000,
+                 max_open_cases: int = 10000, initial_capacity: int = 16) -> None:
+        """
+        Initialize an empty matrix.
+        Args:
+            mode (str): One of "count", "decay" and "window".
+            decay (float): Decay factor per observed relation, in (0, 1], used in "decay" mode.
+            window_size (int): Number of most recent relations counted in "window" mode.
+            max_open_cases (int): Maximum number of cases whose last activity is remembered; the least recently active case is forgotten first.
+            initial_capacity (int): Number of activities the matrix has room for before it grows.
+        Raises:
+            ValueError: If the mode is unknown, or if decay is not in (0, 1] in "decay" mode
+                or window_size is smaller than 1 in "window" mode.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}.")
+        if mode == "decay" and not 0 < decay <= 1:
+            raise ValueError(f"decay must be in (0, 1], got {decay}.")
+        if mode == "window" and window_size < 1:
+            raise ValueError(f"window_size must be at least 1, got {window_size}.")
+        self.mode: str = mode
+        self.decay: float = decay
+        self.window_size: int = window_size
+        self.max_open_cases: int = max_open_cases
+        self.activities = SymbolTable()
+        self.counts: np.ndarray = np.zeros((initial_capacity, initial_capacity),
+                                           dtype=np.float64 if mode == "decay" else np.int64)
+        self.last_activities: OrderedDict[str, int] = OrderedDict()  # {case ID: last activity index}, least recently active first
+        self.scale: float = 1.0  # Weight of the next relation in "decay" mode
+        self.window_rows: np.ndarray = np.zeros(window_size if mode == "window" else 0, dtype=np.int32)
+        self.window_cols: np.ndarray = np.zeros(window_size if mode == "window" else 0, dtype=np.int32)
+        self.window_filled: int = 0
+        self.window_next: int = 0  # Ring buffer position of the next relation
+
+    def add_event(self, event: BEvent) -> None:
+        """
+        Add an event, counting the relation from the previous activity of its case.
+        Args:
+            event (BEvent): The event to add.
+        """
+        activity = self.activities.intern(event.get_event_name())
+        if activity >= self.counts.shape[0]:
+            self._grow(activity + 1)
+        case_id = event.get_trace_name()
+        previous = self.last_activities.pop(case_id, None)
+        self.last_activities[case_id] = activity
+        if len(self.last_activities) > self.max_open_cases:
+            self.last_activities.popitem(last=False)
+        if previous is not None:
+            self._count(previous, activity)
+
+    def _count(self, source: int, target: int) -> None:
+        """
+        Count one directly-follows relation.
+        Args:
+            source (int): Index of the preceding activity.
+            target (int): Index of the following activity.
+        """
+        if self.mode == "count":
+            self.counts[source, target] += 1
+        elif self.mode == "decay":
+            self.scale /= self.decay
+            self.counts[source, target] += self.scale
+            if self.scale > RESCALE_THRESHOLD:
+                self.counts /= self.scale
+                self.scale = 1.0
+        else:
+            position = self.window_next
+            if self.window_filled == self.window_size:
+                self.counts[self.window_rows[position], self.window_cols[position]] -= 1
+            else:
+                self.window_filled += 1
+            self.window_rows[position] = source
+            self.window_cols[position] = target
+            self.counts[source, target] += 1
+            self.window_next = (position + 1) % self.window_size
+
+    def _grow(self, min_capacity: int) -> None:
+        """
+        Enlarge the matrix, at least doubling its capacity.
+        Args:
+            min_capacity (int): The number of activities the matrix must have room for.
+        """
+        capacity = max(min_capacity, 2 * self.counts.shape[0])
+        counts = np.zeros((capacity, capacity), dtype=self.counts.dtype)
+        size = self.counts.shape[0]
+        counts[:size, :size] = self.counts
+        self.counts = counts
+
+    def get_activities(self) -> List[str]:
+        """
+        Return the activity names in the order of the matrix rows and columns.
+        Returns:
+            List[str]: The activity names.
+        """
+        return list(self.activities.values)
+
+    def get_dfg(self) -> np.ndarray:
+        """
+        Return the directly-follows graph as a matrix, row and column i standing for activity i of get_activities.
+        Returns:
+            np.ndarray: A copy of the counts, decayed to the current relation in "decay" mode.
+        """
+        size = len(self.activities)
+        if self.mode == "decay":
+            return self.counts[:size, :size] / self.scale
+        return self.counts[:size, :size].copy()
@@ -1,10 +1,13 @@
-from typing import List
+import sys
+from itertools import islice
+from typing import Dict, Iterable, Iterator, KeysView, List, Mapping, Optional, Tuple
 
 from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.summary_views import SummaryViews
 
 
 class MemoryManager:
@@ -13,12 +16,14 @@ class MemoryManager:
     Handles the addition of events, merging of observable units, and retrieval of managed data.
     """
 
-    def __init__(self, policy: BasePolicy, handler: BaseObservableUnitHandler):
+    def __init__(self, policy: BasePolicy, handler: BaseObservableUnitHandler, track_views: bool = False):
         """
         Initialize the MemoryManager with a policy and handler.
         Args:
             policy (BasePolicy): The memory management policy to use.
             handler (BaseObservableUnitHandler): The handler for observable units.
+            track_views (bool): Maintain the activities, DFG and variants of the summary on every update,
+                for get_activities, get_dfg and get_variants. The policy must not hold any units yet.
         Raises:
             TypeError: If handler.unit_class is not a subclass of BaseObservableUnit.
         """
@@ -26,16 +31,30 @@ class MemoryManager:
         self.handler = handler
         if not issubclass(handler.unit_class, BaseObservableUnit):
             raise TypeError(f"Handler's unit_class {handler.unit_class} must be a subclass of BaseObservableUnit.")
+        self.views: Optional[SummaryViews] = None
+        if track_views:
+            self.views = SummaryViews()
+            policy.add_listener(self.views)
 
     def add_event(self, event: BEvent) -> None:
         """
         Add a new event to the memory manager.
         Converts the event to an observable unit, merges if possible, and updates the policy.
+        If both the handler and the policy support it, the event is appended to the open unit of its case in place.
+        Events the handler converts to None are not passed to the policy.
         Args:
             event (BEvent): The event to add.
         """
-        observable_unit: BaseObservableUnit = self.handler.convert(event)
-        mergeable_units: List[BaseObservableUnit] = self.policy.get_mergeable_elements(observable_unit.get_case_id())
+        if self.handler.supports_extend:
+            case_id = self.handler.get_case_id(event)
+            if self.policy.extend_element(case_id, lambda unit: self.handler.extend(unit, event)):
+                return
+        observable_unit: Optional[BaseObservableUnit] = self.handler.convert(event)
+        if observable_unit is None:
+            return
+        mergeable_units: List[BaseObservableUnit] = []
+        if observable_unit.is_mergeable():
+            mergeable_units = self.policy.get_mergeable_elements(observable_unit.get_case_id())
         if len(mergeable_units) > 0:
             self.policy.remove_elements(mergeable_units)
             mergeable_units.append(observable_unit)
@@ -45,6 +64,121 @@ class MemoryManager:
         else:
             self.policy.update(observable_unit)
 
+    def add_events(self, events: Iterable[BEvent], batch_size: int = 1024, exact: bool = True) -> None:
+        """
+        Add several events to the memory manager. If exact, the result is the same as calling add_event for each of them:
+        a seeded ReservoirSamplingPolicy samples with the same probabilities, but units may end up in other
+        slots, so later replacements can keep a different sample than sequential ingestion with the same seed.
+        Events are grouped by case as far as the policy's batch_capacity allows: the stored units of a case are
+        fetched and merged once per batch and all resulting units are passed to the policy in one update_batch call.
+        A batch ends after the event with which it holds more units than the capacity, the units taken out of the
+        policy included. A full sliding window leaves units in place that sequential ingestion would have evicted
+        meanwhile and a full tumbling window groups the events that continue stored cases, so both keep grouping
+        at steady state. Counting policies count every update, so they only group events if exact is False.
+        Events are read lazily, one batch at a time.
+        Args:
+            events (Iterable[BEvent]): The events to add, in stream order.
+            batch_size (int): Maximum number of events grouped at once, bounding the units held outside the policy.
+            exact (bool): If False, every batch is grouped regardless of the policy's capacity, as if the events
+                of a case in a batch had arrived at once: intermediate units of a case are never passed to the
+                policy, and evictions only happen once the batch is stored. This is the fast path for the
+                counting policies, whose counts then skip the intermediate units.
+        """
+        events = iter(events)
+        while True:
+            capacity = self.policy.batch_capacity()
+            if exact and capacity is None:
+                event = next(events, None)
+                if event is None:
+                    return
+                self.add_event(event)
+            elif not self._add_batch(events, batch_size, exact):
+                return
+
+    def _add_batch(self, events: Iterator[BEvent], batch_size: int, exact: bool) -> bool:
+        """
+        Add a batch of events, merging per case.
+        Resulting units are passed to the policy in the order of the events that produced them,
+        which is the order sequential ingestion would leave them in.
+        Args:
+            events (Iterator[BEvent]): The events to add, in stream order, of which at most batch_size are read.
+            batch_size (int): Maximum number of events in the batch.
+            exact (bool): Whether the batch ends after the event with which it holds more units than the
+                policy's batch_capacity.
+        Returns:
+            bool: False if events had no event left, True otherwise.
+        """
+        produced: List[Optional[BaseObservableUnit]] = []  # Units in production order, None once merged into a later unit
+        open_units: Dict[str, List[int]] = {}  # {case ID: positions of its mergeable units in produced}
+        merged = [0]  # Positions of produced set to None, so the batch holds len(produced) - merged[0] units
+        capacity = [self.policy.batch_capacity() if exact else None]
+        read = 0
+        for event in islice(events, batch_size):
+            read += 1
+            if self.handler.supports_extend:
+                positions = self._open_positions(self.handler.get_case_id(event), open_units, produced, merged, capacity)
+                if len(positions) == 1:
+                    unit = produced[positions[0]]
+                    produced[positions[0]] = None
+                    merged[0] += 1
+                    self.handler.extend(unit, event)
+                    positions[0] = len(produced)
+                    produced.append(unit)
+                    continue
+            observable_unit: Optional[BaseObservableUnit] = self.handler.convert(event)
+            if observable_unit is None:
+                continue
+            if not observable_unit.is_mergeable():
+                produced.append(observable_unit)
+            else:
+                positions = self._open_positions(observable_unit.get_case_id(), open_units, produced, merged, capacity)
+                if positions:
+                    mergeable_units = [produced[position] for position in positions]
+                    for position in positions:
+                        produced[position] = None
+                    merged[0] += len(positions)
+                    mergeable_units.append(observable_unit)
+                    merged_observable_units = self.handler.merge(mergeable_units)
+                else:
+                    merged_observable_units = [observable_unit]
+                positions.clear()
+                for merged_observable_unit in merged_observable_units:
+                    if merged_observable_unit.is_mergeable():
+                        positions.append(len(produced))
+                    produced.append(merged_observable_unit)
+            # The policy only evicts once the units are stored, so the batch ends with the first event
+            # that would have made it evict one of the held units
+            if capacity[0] is not None and len(produced) - merged[0] > capacity[0]:
+                break
+        if produced:
+            self.policy.update_batch([unit for unit in produced if unit is not None])
+        return read > 0
+
+    def _open_positions(self, case_id: str, open_units: Dict[str, List[int]], produced: List[Optional[BaseObservableUnit]],
+                        merged: List[int], capacity: List[Optional[int]]) -> List[int]:
+        """
+        Return the positions of the mergeable units of a case in a batch.
+        The first time a case is seen, its stored mergeable units are taken out of the policy and appended to produced,
+        after which the policy's batch capacity is read again.
+        Args:
+            case_id (str): The case identifier.
+            open_units (Dict[str, List[int]]): Positions of the mergeable units of the cases seen so far.
+            produced (List[Optional[BaseObservableUnit]]): The units of the batch in production order.
+            merged (List[int]): Number of positions of produced set to None.
+            capacity (List[Optional[int]]): The batch capacity of the policy, None if unlimited, updated in place.
+        Returns:
+            List[int]: The positions, which the caller may update in place.
+        """
+        positions = open_units.get(case_id)
+        if positions is None:
+            stored_units = self.policy.pop_mergeable_elements(case_id, len(produced) - merged[0])
+            positions = list(range(len(produced), len(produced) + len(stored_units)))
+            produced.extend(stored_units)
+            open_units[case_id] = positions
+            if stored_units and capacity[0] is not None:
+                capacity[0] = self.policy.batch_capacity()
+        return positions
+
     def get_data(self) -> List[BEvent]:
         """
         Retrieve all managed events as a list of BEvent objects.
@@ -53,18 +187,63 @@ class MemoryManager:
         """
         return self.handler.convert_back(self.policy.get_data())
 
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the summary, in O(1) from sizes the policy and the handler maintain
+        incrementally. Cheap enough to call after every event, unlike a full traversal with pympler's asizeof.
+        Returns:
+            int: The estimated size in bytes of the manager, the policy, its units and the handler.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(vars(self)) + self.policy.estimated_bytes() + self.handler.estimated_bytes()
 
+    def get_activities(self) -> KeysView[str]:
+        """
+        Return the activities of the managed units, without converting them back.
+        Returns:
+            KeysView[str]: A live, set-like view of the activities.
+        Raises:
+            RuntimeError: If the manager was created without track_views.
+        """
+        return self._get_views().get_activities()
 
+    def get_dfg(self) -> Mapping[Tuple[str, str], int]:
+        """
+        Return the directly-follows relations of the managed cases, without converting them back.
+        Only available if the handler's units hold whole cases (handler.holds_cases): events and DFRs
+        of a case are spread over units that policies evict and count independently, so their relations
+        can only be read from get_data.
+        Returns:
+            Mapping[Tuple[str, str], int]: A live, read-only view of the occurrences of every relation.
+        Raises:
+            RuntimeError: If the manager was created without track_views, or its units do not hold whole cases.
+        """
+        return self._get_views(cases=True).get_dfg()
 
+    def get_variants(self) -> Mapping[Tuple[str, ...], int]:
+        """
+        Return the variants of the managed cases, without converting them back.
+        Only available if the handler's units hold whole cases (handler.holds_cases), see get_dfg.
+        Returns:
+            Mapping[Tuple[str, ...], int]: A live, read-only view of the number of units of every activity sequence.
+        Raises:
+            RuntimeError: If the manager was created without track_views, or its units do not hold whole cases.
+        """
+        return self._get_views(cases=True).get_variants()
 
-
-
-
-
-
-
-
-
-
-
-
+    def _get_views(self, cases: bool = False) -> SummaryViews:
+        """
+        Return the views maintained for the summary.
+        Args:
+            cases (bool): Whether the caller reads per case views, which need units holding whole cases.
+        Returns:
+            SummaryViews: The views.
+        Raises:
+            RuntimeError: If the manager was created without track_views, or cases is True and
+                the handler's units do not hold whole cases.
+        """
+        if self.views is None:
+            raise RuntimeError("Summary views are only maintained if the MemoryManager is created with track_views=True.")
+        if cases and not self.handler.holds_cases:
+            raise RuntimeError(f"{type(self.handler).__name__} units do not hold whole cases, "
+                               f"read their relations and variants from get_data.")
+        return self.views
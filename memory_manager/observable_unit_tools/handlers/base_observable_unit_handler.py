@@ -1,5 +1,6 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Type, List
+from typing import Generic, Optional, TypeVar, Type, List
 
 from pybeamline.bevent import BEvent
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
@@ -13,6 +14,8 @@ class BaseObservableUnitHandler(ABC, Generic[U]):
     merging units, and converting units back to events.
     """
     unit_class: Type[U]  # The class of observable unit this handler manages
+    supports_extend: bool = False  # Whether extend can append an event to an open unit in place
+    holds_cases: bool = False  # Whether a unit holds every stored event of its case, in order
 
     @abstractmethod
     def __init__(self) -> None:
@@ -23,16 +26,44 @@ class BaseObservableUnitHandler(ABC, Generic[U]):
         pass
 
     @abstractmethod
-    def convert(self, event: BEvent) -> U:
+    def convert(self, event: BEvent) -> Optional[U]:
         """
         Convert a BEvent to an observable unit.
         Args:
             event (BEvent): The event to convert.
         Returns:
-            U: The resulting observable unit.
+            Optional[U]: The resulting observable unit, or None if the event does not yield a unit on its own.
         """
         pass
 
+    def get_case_id(self, event: BEvent) -> str:
+        """
+        Return the case ID the unit converted from an event would have.
+        Args:
+            event (BEvent): The event.
+        Returns:
+            str: The case identifier.
+        """
+        return event.get_trace_name()
+
+    def extend(self, unit: U, event: BEvent) -> None:
+        """
+        Append an event to an open unit in place, with the same result as merging the unit with convert(event).
+        Only called if supports_extend is True.
+        Args:
+            unit (U): The open unit of the event's case.
+            event (BEvent): The event to append.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support extending units in place.")
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the handler itself, outside the units it created.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(vars(self))
+
     @abstractmethod
     def merge(self, units: List[U]) -> List[U]:
         """
@@ -1,10 +1,14 @@
-from typing import List
+import sys
+from collections import OrderedDict
+from typing import List, Optional
 
 from typing import override
 from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler, U
 from memory_manager.observable_unit_tools.units.dfr_observable_unit import DfrObservableUnit
+from memory_manager.tools.event_record import EventRecord
+from memory_manager.tools.memory_mamager_helper import MemoryManagerHelper
 
 
 class DfrObservableUnitHandler(BaseObservableUnitHandler[DfrObservableUnit]):
@@ -12,28 +16,54 @@ class DfrObservableUnitHandler(BaseObservableUnitHandler[DfrObservableUnit]):
     Handler for DfrObservableUnit objects.
     Implements conversion between BEvent and DfrObservableUnit,
     merging units, and converting units back to events.
+
+    The handler pairs events itself: it remembers the last event of every open case in a table with
+    least-recently-used expiry, so each event after the first of its case becomes a complete DFR in O(1),
+    without asking the policy for a half-open unit. The first event of a case yields no unit.
     """
 
     unit_class = DfrObservableUnit
+    OPEN_CASE_BYTES: int = 170  # Estimated last event and case ID per open case, measured with pympler
 
     @override
-    def __init__(self) -> None:
+    def __init__(self, max_open_cases: int = 10000) -> None:
         """
         Initialize the DfrObservableUnitHandler.
         Calls the base class initializer.
+        Args:
+            max_open_cases (int): Maximum number of cases whose last event is remembered; the least recently active case is forgotten first.
         """
         super().__init__()
+        self.max_open_cases: int = max_open_cases
+        self.last_events: OrderedDict[str, EventRecord] = OrderedDict()  # {case ID: last event}, least recently active first
 
     @override
-    def convert(self, event: BEvent) -> DfrObservableUnit:
+    def convert(self, event: BEvent) -> Optional[DfrObservableUnit]:
         """
-        Convert a BEvent to a DfrObservableUnit.
+        Convert a BEvent to a DfrObservableUnit with the previous event of its case.
         Args:
             event (BEvent): The event to convert.
         Returns:
-            DfrObservableUnit: The resulting observable unit.
+            Optional[DfrObservableUnit]: The complete DFR ending in the event, or None if no previous event of the case is known.
+        """
+        record = EventRecord.from_event(event)
+        case_id = record.case
+        previous = self.last_events.pop(case_id, None)
+        self.last_events[case_id] = record
+        if len(self.last_events) > self.max_open_cases:
+            self.last_events.popitem(last=False)
+        if previous is None:
+            return None
+        return DfrObservableUnit(previous, record)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the handler, including the last event of every open case.
+        Returns:
+            int: The estimated size in bytes.
         """
-        return DfrObservableUnit(event, None)
+        return super().estimated_bytes() + sys.getsizeof(self.last_events) + len(self.last_events) * self.OPEN_CASE_BYTES
 
     @override
     def merge(self, units: List[DfrObservableUnit]) -> List[DfrObservableUnit]:
@@ -53,18 +83,20 @@ class DfrObservableUnitHandler(BaseObservableUnitHandler[DfrObservableUnit]):
     def convert_back(self, units: List[DfrObservableUnit]) -> List[BEvent]:
         """
         Convert a list of DfrObservableUnit objects back to BEvent objects.
-        Ensures no duplicates in the returned list.
+        Ensures no duplicates in the returned list: events with the same name, trace and time are returned once,
+        in order of first occurrence.
         Args:
             units (List[DfrObservableUnit]): The units to convert.
         Returns:
             List[BEvent]: The resulting list of events.
         """
         ret = []
+        seen = set()
         for unit in units:
-            if unit.first is not None:
-                if unit.first not in ret:
-                    ret.append(unit.first)
-            if unit.second is not None:
-                if unit.second not in ret:
-                    ret.append(unit.second)
+            for record in (unit.first, unit.second):
+                if record is not None:
+                    key = MemoryManagerHelper.event_key(record)
+                    if key not in seen:
+                        seen.add(key)
+                        ret.append(record.to_event())
         return ret
@@ -4,6 +4,7 @@ from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler, U
 from memory_manager.observable_unit_tools.units.event_observable_unit import EventObservableUnit
+from memory_manager.tools.event_record import EventRecord
 
 
 class EventObservableUnitHandler(BaseObservableUnitHandler[EventObservableUnit]):
@@ -44,7 +45,7 @@ class EventObservableUnitHandler(BaseObservableUnitHandler[EventObservableUnit])
         Returns:
             EventObservableUnit: The resulting observable unit.
         """
-        return EventObservableUnit(event)
+        return EventObservableUnit(EventRecord.from_event(event))
 
     @override
     def convert_back(self, units: List[EventObservableUnit]) -> List[BEvent]:
@@ -55,4 +56,4 @@ class EventObservableUnitHandler(BaseObservableUnitHandler[EventObservableUnit])
         Returns:
             List[BEvent]: The resulting list of events.
         """
-        return [unit.event for unit in units]
+        return [unit.event.to_event() for unit in units]
@@ -4,6 +4,7 @@ from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler, U
 from memory_manager.observable_unit_tools.units.trace_observable_unit import TraceObservableUnit
+from memory_manager.tools.symbol_table import SymbolTable
 
 
 class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit]):
@@ -14,6 +15,8 @@ class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit])
     """
 
     unit_class = TraceObservableUnit
+    supports_extend = True
+    holds_cases = True
 
     @override
     def __init__(self) -> None:
@@ -22,6 +25,7 @@ class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit])
         Calls the base class initializer.
         """
         super().__init__()
+        self.symbols = SymbolTable()  # Interned names of the units created by this handler
 
     @override
     def convert(self, event: BEvent) -> TraceObservableUnit:
@@ -32,7 +36,26 @@ class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit])
         Returns:
             TraceObservableUnit: The resulting observable unit.
         """
-        return TraceObservableUnit([event])
+        return TraceObservableUnit(self.symbols, [event])
+
+    @override
+    def extend(self, unit: TraceObservableUnit, event: BEvent) -> None:
+        """
+        Append an event to the trace in place.
+        Args:
+            unit (TraceObservableUnit): The open trace of the event's case.
+            event (BEvent): The event to append.
+        """
+        unit.append(event)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the handler, including its symbol table.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return super().estimated_bytes() + self.symbols.estimated_bytes()
 
     @override
     def merge(self, units: List[TraceObservableUnit]) -> List[TraceObservableUnit]:
@@ -46,7 +69,7 @@ class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit])
         """
         if len(units) == 2:
             ret = units[0]
-            ret.events += units[1].events
+            ret.extend(units[1])
             return [ret]
         return []
 
@@ -61,5 +84,5 @@ class TraceObservableUnitHandler(BaseObservableUnitHandler[TraceObservableUnit])
         """
         ret = []
         for unit in units:
-            ret.extend(unit.events)
+            ret.extend(unit.to_events())
         return ret
@@ -4,6 +4,8 @@ from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler, U
 from memory_manager.observable_unit_tools.units.variant_observable_unit import VariantObservableUnit
+from memory_manager.tools.symbol_table import SymbolTable
+from memory_manager.tools.variant_trie import VariantTrie
 
 
 class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUnit]):
@@ -14,6 +16,8 @@ class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUn
     """
 
     unit_class = VariantObservableUnit
+    supports_extend = True
+    holds_cases = True
 
     @override
     def __init__(self) -> None:
@@ -22,6 +26,8 @@ class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUn
         Calls the base class initializer.
         """
         super().__init__()
+        self.symbols = SymbolTable()  # Interned names of the units created by this handler
+        self.trie = VariantTrie(self.symbols)  # Activity sequences of the units created by this handler
 
     @override
     def convert(self, event: BEvent) -> VariantObservableUnit:
@@ -32,7 +38,26 @@ class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUn
         Returns:
             VariantObservableUnit: The resulting observable unit.
         """
-        return VariantObservableUnit([event])
+        return VariantObservableUnit(self.trie, [event])
+
+    @override
+    def extend(self, unit: VariantObservableUnit, event: BEvent) -> None:
+        """
+        Append an event to the variant in place.
+        Args:
+            unit (VariantObservableUnit): The open variant of the event's case.
+            event (BEvent): The event to append.
+        """
+        unit.append(event)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the handler, including its symbol table and variant trie.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return super().estimated_bytes() + self.symbols.estimated_bytes() + self.trie.estimated_bytes()
 
     @override
     def merge(self, units: List[VariantObservableUnit]) -> List[VariantObservableUnit]:
@@ -46,7 +71,7 @@ class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUn
         """
         if len(units) == 2:
             ret = units[0]
-            ret.events += units[1].events
+            ret.extend(units[1])
             return [ret]
         return []
 
@@ -61,5 +86,5 @@ class VariantObservableUnitHandler(BaseObservableUnitHandler[VariantObservableUn
         """
         ret = []
         for unit in units:
-            ret.extend(unit.events)
+            ret.extend(unit.to_events())
         return ret
\ No newline at end of file
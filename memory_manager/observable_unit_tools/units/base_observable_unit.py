@@ -1,11 +1,17 @@
+import sys
 from abc import ABC, abstractmethod
+from typing import Tuple
 
 class BaseObservableUnit(ABC):
     """
     Abstract base class for observable units.
     Defines the required interface for all observable unit types.
+    Units are created for every event and cloned for every (unit, case) pair a counting policy hands out,
+    so they declare __slots__ instead of carrying a per-instance __dict__.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def __init__(self) -> None:
         """
@@ -32,6 +38,24 @@ class BaseObservableUnit(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_activity_names(self) -> Tuple[str, ...]:
+        """
+        Return the activity names of the events in this unit.
+        Returns:
+            Tuple[str, ...]: The activity names, in order.
+        """
+        pass
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by this unit alone. Objects shared with the handler, such as
+        symbol tables and variant trie nodes, and strings shared with the stream are not counted.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self)
+
     @abstractmethod
     def set_case_id(self, case_id: str) -> None:
         pass
@@ -1,25 +1,32 @@
-from typing import Optional
+import sys
+from typing import Optional, Tuple
 from typing import override
-from pybeamline.bevent import BEvent
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
-from memory_manager.tools.memory_mamager_helper import MemoryManagerHelper
+from memory_manager.tools.event_record import EventRecord
 
 
 class DfrObservableUnit(BaseObservableUnit):
     """
-    Observable unit representing a Directly-Follows Relation (DFR) between two BEvent objects.
+    Observable unit representing a Directly-Follows Relation (DFR) between two events, kept as EventRecords.
     """
 
-    def __init__(self, first: Optional[BEvent], second: Optional[BEvent]) -> None:
+    __slots__ = ("first", "second", "_key", "_hash")
+
+    def __init__(self, first: Optional[EventRecord], second: Optional[EventRecord]) -> None:
         """
-        Initialize the DfrObservableUnit with two optional BEvent objects.
+        Initialize the DfrObservableUnit with two optional event records.
         Args:
-            first (Optional[BEvent]): The first event in the pair.
-            second (Optional[BEvent]): The second event in the pair.
+            first (Optional[EventRecord]): The first event in the pair.
+            second (Optional[EventRecord]): The second event in the pair.
         """
         self.first = first
         self.second = second
+        self._key: tuple[Optional[str], Optional[str]] = (  # Activity names, which set_case_id does not change
+            first.get_event_name() if first is not None else None,
+            second.get_event_name() if second is not None else None,
+        )
+        self._hash: int = hash(self._key)
 
     @override
     def get_case_id(self) -> str | None:
@@ -34,6 +41,27 @@ class DfrObservableUnit(BaseObservableUnit):
             return self.second.get_trace_name()
         return None
 
+    @override
+    def get_activity_names(self) -> Tuple[str, ...]:
+        """
+        Return the activity names of the events present in the DFR.
+        Returns:
+            Tuple[str, ...]: The activity names, in order.
+        """
+        return tuple(name for name in self._key if name is not None)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the unit, its key, its cached hash and its last event record.
+        The first record of a relation is the last record of the preceding relation of the case, so it is not counted twice.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        record = self.second if self.second is not None else self.first
+        size = sys.getsizeof(self) + sys.getsizeof(self._key) + sys.getsizeof(self._hash)
+        return size + (record.estimated_bytes() if record is not None else 0)
+
     @override
     def is_mergeable(self) -> bool:
         """
@@ -54,20 +82,11 @@ class DfrObservableUnit(BaseObservableUnit):
         """
         if not isinstance(other, DfrObservableUnit):
             return NotImplemented
-        return (
-            MemoryManagerHelper.event_names_equal(self.first, other.first) and
-            MemoryManagerHelper.event_names_equal(self.second, other.second)
-        )
+        return self._key == other._key
 
     @override
     def clone(self):
-        first = None
-        second = None
-        if self.first is not None:
-            first = MemoryManagerHelper.clone_event(self.first)
-        if self.second is not None:
-            second = MemoryManagerHelper.clone_event(self.second)
-        return DfrObservableUnit(first, second)
+        return DfrObservableUnit(self.first, self.second)
 
     @override
     def __hash__(self):
@@ -76,13 +95,11 @@ class DfrObservableUnit(BaseObservableUnit):
         Returns:
             int: The hash value.
         """
-        first_name = self.first.get_event_name() if self.first is not None else None
-        second_name = self.second.get_event_name() if self.second is not None else None
-        return hash((first_name, second_name))
+        return self._hash
 
     @override
     def set_case_id(self, case_id: str) -> None:
         if self.first is not None:
-            self.first = MemoryManagerHelper.set_event_case_id(case_id, self.first)
+            self.first = self.first.with_case_id(case_id)
         if self.second is not None:
-            self.second = MemoryManagerHelper.set_event_case_id(case_id, self.second)
\ No newline at end of file
+            self.second = self.second.with_case_id(case_id)
\ No newline at end of file
@@ -1,24 +1,28 @@
-from typing import override
-from pybeamline.bevent import BEvent
+import sys
+from typing import Tuple, override
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+from memory_manager.tools.event_record import EventRecord
 from memory_manager.tools.memory_mamager_helper import MemoryManagerHelper
 
 
 class EventObservableUnit(BaseObservableUnit):
     """
-    Observable unit representing a single BEvent object.
+    Observable unit representing a single event, kept as an EventRecord.
     """
 
+    __slots__ = ("event", "_hash")
+
     @override
-    def __init__(self, event: BEvent) -> None:
+    def __init__(self, event: EventRecord) -> None:
         """
-        Initialize the EventObservableUnit with a BEvent.
+        Initialize the EventObservableUnit with an event record.
         Args:
-            event (BEvent): The event to wrap.
+            event (EventRecord): The event to wrap.
         """
         super().__init__()
         self.event = event
+        self._hash: int = MemoryManagerHelper.event_hash(event)  # Cached, the event is only replaced by set_case_id
 
     @override
     def get_case_id(self) -> str:
@@ -29,6 +33,24 @@ class EventObservableUnit(BaseObservableUnit):
         """
         return self.event.get_trace_name()
 
+    @override
+    def get_activity_names(self) -> Tuple[str, ...]:
+        """
+        Return the activity name of the event.
+        Returns:
+            Tuple[str, ...]: The activity name.
+        """
+        return (self.event.get_event_name(),)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the unit, its cached hash and its event record.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self._hash) + self.event.estimated_bytes()
+
     @override
     def is_mergeable(self) -> bool:
         """
@@ -55,7 +77,7 @@ class EventObservableUnit(BaseObservableUnit):
     def clone(self):
         if self.event is None:
             return None
-        return EventObservableUnit(MemoryManagerHelper.clone_event(self.event))
+        return EventObservableUnit(self.event)
 
     @override
     def __hash__(self) -> int:
@@ -64,9 +86,10 @@ class EventObservableUnit(BaseObservableUnit):
         Returns:
             int: The hash value.
         """
-        return MemoryManagerHelper.event_hash(self.event)
+        return self._hash
 
     @override
     def set_case_id(self, new_case_id: str) -> None:
         if self.event is not None:
-            self.event = MemoryManagerHelper.set_event_case_id(new_case_id, self.event)
\ No newline at end of file
+            self.event = self.event.with_case_id(new_case_id)
+            self._hash = MemoryManagerHelper.event_hash(self.event)
\ No newline at end of file
@@ -0,0 +1,190 @@
+import sys
+from abc import abstractmethod
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence, Tuple, override
+
+from pybeamline.bevent import BEvent
+
+from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+from memory_manager.tools.symbol_table import SymbolTable
+
+NO_TIME = -(2 ** 63)  # Stored in place of a missing event time
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class EventSequenceObservableUnit(BaseObservableUnit):
+    """
+    Base class for observable units holding a sequence of events of one case.
+
+    Events are not kept as BEvent objects. Activity names, process names and time zones are interned
+    in the handler's symbol table and stored column-wise in integer arrays, event times as microseconds
+    since the epoch, and the case ID once per unit. Case IDs are not interned, since the table never
+    releases symbols and a stream keeps bringing new cases. Cloning copies the arrays, relabelling only
+    changes the case ID, and BEvent objects are rebuilt by to_events when the unit is converted back.
+    Subclasses decide how the activity symbols are stored.
+    """
+
+    __slots__ = ("symbols", "case", "processes", "zones", "times")
+
+    def __init__(self, symbols: SymbolTable, events: Iterable[BEvent]) -> None:
+        """
+        Initialize the unit with a sequence of events.
+        Args:
+            symbols (SymbolTable): The symbol table of the handler owning the unit.
+            events (Iterable[BEvent]): The events of the unit, all of the same case.
+        """
+        super().__init__()
+        self.symbols: SymbolTable = symbols
+        self.case: Optional[str] = None  # Case ID, None while the unit is empty
+        self.processes: array = array('i')
+        self.zones: array = array('i')  # Symbol of each event time's tzinfo, None for naive times
+        self.times: array = array('q')  # Microseconds since the epoch, in UTC for aware times
+        for event in events:
+            self.append(event)
+
+    def append(self, event: BEvent) -> None:
+        """
+        Append an event to the unit.
+        Args:
+            event (BEvent): The event to append.
+        """
+        if self.case is None:
+            self.case = event.get_trace_name()
+        self._append_activity(self.symbols.intern(event.get_event_name()))
+        self.processes.append(self.symbols.intern(event.get_process_name()))
+        time = event.get_event_time()
+        if time is None:
+            self.zones.append(self.symbols.intern(None))
+            self.times.append(NO_TIME)
+        elif time.tzinfo is None:
+            self.zones.append(self.symbols.intern(None))
+            self.times.append((time - EPOCH) // ONE_MICROSECOND)
+        else:
+            self.zones.append(self.symbols.intern(time.tzinfo))
+            self.times.append((time - EPOCH_UTC) // ONE_MICROSECOND)
+
+    def extend(self, other: "EventSequenceObservableUnit") -> None:
+        """
+        Append the events of another unit sharing the same symbol table.
+        Args:
+            other (EventSequenceObservableUnit): The unit whose events to append.
+        """
+        if self.case is None:
+            self.case = other.case
+        self._extend_activities(other)
+        self.processes.extend(other.processes)
+        self.zones.extend(other.zones)
+        self.times.extend(other.times)
+
+    def to_events(self) -> List[BEvent]:
+        """
+        Rebuild the events of the unit.
+        Returns:
+            List[BEvent]: The events, in order.
+        """
+        lookup = self.symbols.lookup
+        case_id = self.get_case_id()
+        events = []
+        for activity, process, zone, micros in zip(self.get_activities(), self.processes, self.zones, self.times):
+            tz = lookup(zone)
+            if micros == NO_TIME:
+                time = None
+            elif tz is None:
+                time = EPOCH + micros * ONE_MICROSECOND
+            else:
+                time = (EPOCH_UTC + micros * ONE_MICROSECOND).astimezone(tz)
+            events.append(BEvent(lookup(activity), case_id, lookup(process), time))
+        return events
+
+    def __len__(self) -> int:
+        """
+        Return the number of events in the unit.
+        Returns:
+            int: The number of events.
+        """
+        return len(self.times)
+
+    @abstractmethod
+    def get_activities(self) -> Sequence[int]:
+        """
+        Return the activity symbols of the unit.
+        Returns:
+            Sequence[int]: The activity symbols, in order.
+        """
+        pass
+
+    @abstractmethod
+    def _append_activity(self, activity: int) -> None:
+        """
+        Append an activity symbol to the unit.
+        Args:
+            activity (int): The activity symbol.
+        """
+        pass
+
+    @abstractmethod
+    def _extend_activities(self, other: "EventSequenceObservableUnit") -> None:
+        """
+        Append the activity symbols of another unit.
+        Args:
+            other (EventSequenceObservableUnit): The unit whose activities to append.
+        """
+        pass
+
+    @override
+    def get_activity_names(self) -> Tuple[str, ...]:
+        """
+        Return the activity names of the unit.
+        Returns:
+            Tuple[str, ...]: The activity names, in order.
+        """
+        lookup = self.symbols.lookup
+        return tuple(lookup(activity) for activity in self.get_activities())
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the unit, its case ID and its columns. Interned values belong to the symbol table.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return (sys.getsizeof(self) + sys.getsizeof(self.case) + sys.getsizeof(self.processes) + sys.getsizeof(self.zones)
+                + sys.getsizeof(self.times))
+
+    @override
+    def get_case_id(self) -> str:
+        """
+        Return the case ID of the unit.
+        Returns:
+            str: The case ID, or "none" if the unit is empty.
+        """
+        if self.case is None:
+            return "none"
+        return self.case
+
+    @override
+    def set_case_id(self, case_id: str) -> None:
+        """
+        Relabel the unit with a new case ID.
+        Args:
+            case_id (str): The new case ID.
+        """
+        if self.case is not None:
+            self.case = case_id
+
+    def _copy_into(self, other: "EventSequenceObservableUnit") -> "EventSequenceObservableUnit":
+        """
+        Copy the case and the per-event columns other than the activities into an empty unit.
+        Args:
+            other (EventSequenceObservableUnit): The empty unit to fill.
+        Returns:
+            EventSequenceObservableUnit: The filled unit.
+        """
+        other.case = self.case
+        other.processes = array('i', self.processes)
+        other.zones = array('i', self.zones)
+        other.times = array('q', self.times)
+        return other
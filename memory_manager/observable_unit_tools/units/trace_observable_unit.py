@@ -1,36 +1,56 @@
-from typing import List, override
+import sys
+from array import array
+from typing import Iterable, Sequence, override
 
 from pybeamline.bevent import BEvent
 
-from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
-from memory_manager.tools.memory_mamager_helper import MemoryManagerHelper
+from memory_manager.observable_unit_tools.units.event_sequence_observable_unit import EventSequenceObservableUnit
+from memory_manager.tools.symbol_table import SymbolTable
 
 
-class TraceObservableUnit(BaseObservableUnit):
+class TraceObservableUnit(EventSequenceObservableUnit):
     """
     Observable unit representing a sequence of BEvent objects that form the same trace.
     """
 
+    __slots__ = ("activities",)
+
     @override
-    def __init__(self, events: List[BEvent]) -> None:
+    def __init__(self, symbols: SymbolTable, events: Iterable[BEvent]) -> None:
         """
         Initialize the TraceObservableUnit with a list of BEvent objects.
         Args:
-            events (List[BEvent]): The list of events in the trace.
+            symbols (SymbolTable): The symbol table of the handler owning the unit.
+            events (Iterable[BEvent]): The events in the trace.
+        """
+        self.activities: array = array('i')
+        super().__init__(symbols, events)
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the unit and its columns, including the activity column.
+        Returns:
+            int: The estimated size in bytes.
         """
-        super().__init__()
-        self.events = events
+        return super().estimated_bytes() + sys.getsizeof(self.activities)
 
     @override
-    def get_case_id(self) -> str:
+    def get_activities(self) -> Sequence[int]:
         """
-        Return the case ID for this trace.
+        Return the activity symbols of the trace.
         Returns:
-            str: The case ID, or "none" if the trace is empty.
+            Sequence[int]: The activity symbols, in order.
         """
-        if len(self.events) > 0:
-            return self.events[0].get_trace_name()
-        return "none"
+        return self.activities
+
+    @override
+    def _append_activity(self, activity: int) -> None:
+        self.activities.append(activity)
+
+    @override
+    def _extend_activities(self, other: EventSequenceObservableUnit) -> None:
+        self.activities.extend(other.get_activities())
 
     @override
     def is_mergeable(self) -> bool:
@@ -63,16 +83,8 @@ class TraceObservableUnit(BaseObservableUnit):
         """
         return hash(self.get_case_id())
 
-    @override
-    def set_case_id(self, case_id: str) -> None:
-        new_events = []
-        for event in self.events:
-            new_events.append(MemoryManagerHelper.set_event_case_id(case_id, event))
-        self.events = new_events
-
     @override
     def clone(self):
-        new_events = []
-        for event in self.events:
-            new_events.append(MemoryManagerHelper.clone_event(event))
-        return TraceObservableUnit(new_events)
\ No newline at end of file
+        ret = self._copy_into(TraceObservableUnit(self.symbols, ()))
+        ret.activities = array('i', self.activities)
+        return ret
@@ -1,36 +1,51 @@
-from typing import List, override
+from typing import Iterable, Sequence, override
 
 from pybeamline.bevent import BEvent
 
-from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
-from memory_manager.tools.memory_mamager_helper import MemoryManagerHelper
+from memory_manager.observable_unit_tools.units.event_sequence_observable_unit import EventSequenceObservableUnit
+from memory_manager.tools.variant_trie import VariantNode, VariantTrie
 
 
-class VariantObservableUnit(BaseObservableUnit):
+class VariantObservableUnit(EventSequenceObservableUnit):
     """
     Observable unit representing a variant, i.e., a sequence of activities.
+
+    The activity sequence is a node of the handler's variant trie, so variants sharing a prefix store it once
+    and appending an activity is one child lookup. Since the trie has one node per sequence, the node is the
+    identity of the variant: hashing and equality are O(1). The event times stay with the unit.
     """
 
+    __slots__ = ("trie", "node")
+
     @override
-    def __init__(self, events: List[BEvent]) -> None:
+    def __init__(self, trie: VariantTrie, events: Iterable[BEvent]) -> None:
         """
         Initialize the VariantObservableUnit with a list of BEvent objects.
         Args:
-            events (List[BEvent]): The list of events in the variant.
+            trie (VariantTrie): The variant trie of the handler owning the unit.
+            events (Iterable[BEvent]): The events in the variant.
         """
-        super().__init__()
-        self.events: List[BEvent] = events
+        self.trie: VariantTrie = trie
+        self.node: VariantNode = trie.root
+        super().__init__(trie.symbols, events)
 
     @override
-    def get_case_id(self) -> str:
+    def get_activities(self) -> Sequence[int]:
         """
-        Return the case ID for this variant.
+        Return the activity symbols of the variant, read from the trie.
         Returns:
-            str: The case ID, or "none" if the variant is empty.
+            Sequence[int]: The activity symbols, in order.
         """
-        if len(self.events) > 0:
-            return self.events[0].get_trace_name()
-        return "none"
+        return self.node.activities()
+
+    @override
+    def _append_activity(self, activity: int) -> None:
+        self.node = self.trie.child(self.node, activity)
+
+    @override
+    def _extend_activities(self, other: EventSequenceObservableUnit) -> None:
+        for activity in other.get_activities():
+            self.node = self.trie.child(self.node, activity)
 
     @override
     def is_mergeable(self) -> bool:
@@ -48,38 +63,23 @@ class VariantObservableUnit(BaseObservableUnit):
         Args:
             other: The object to compare with.
         Returns:
-            bool: True if the event sequences are equal, False otherwise.
+            bool: True if the activity sequences are equal, False otherwise.
         """
         if not isinstance(other, VariantObservableUnit):
             return NotImplemented
-        for i in range(0, min(len(self.events), len(other.events))):
-            if not MemoryManagerHelper.event_names_equal(self.events[i], other.events[i]):
-                return False
-        return len(self.events) == len(other.events)
-
-    @override
-    def set_case_id(self, case_id: str) -> None:
-        new_events = []
-        for event in self.events:
-            new_events.append(MemoryManagerHelper.set_event_case_id(case_id, event))
-        self.events = new_events
+        return self.node is other.node
 
     @override
     def __hash__(self) -> int:
         """
-        Return the hash value of the VariantObservableUnit, based on the event names.
+        Return the hash value of the VariantObservableUnit, based on its trie node.
         Returns:
             int: The hash value.
         """
-        return hash(tuple(
-            e.get_event_name() for e in self.events
-        ))
+        return hash(self.node.id)
 
     @override
     def clone(self):
-        new_events = []
-        for event in self.events:
-            new_events.append(MemoryManagerHelper.clone_event(event))
-        return VariantObservableUnit(new_events)
-
-
+        ret = self._copy_into(VariantObservableUnit(self.trie, ()))
+        ret.node = self.node
+        return ret
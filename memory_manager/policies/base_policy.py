@@ -1,7 +1,10 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, List, Optional, Tuple
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+from memory_manager.policies.policy_listener import PolicyListener
+from memory_manager.tools.case_index import CaseIndex
 
 
 class BasePolicy(ABC):
@@ -10,6 +13,10 @@ class BasePolicy(ABC):
     Defines the required interface for all policy types.
     """
 
+    listeners: Tuple[PolicyListener, ...] = ()  # Replaced per instance by add_listener
+    unit_bytes: int = 0  # Estimated size of the stored units, replaced per instance on the first update
+    ENTRY_BYTES: int = 0  # Estimated bookkeeping per stored unit in the policy's containers
+
     @abstractmethod
     def __init__(self) -> None:
         """
@@ -36,6 +43,16 @@ class BasePolicy(ABC):
         """
         pass
 
+    def expand_unit(self, unit: BaseObservableUnit) -> List[BaseObservableUnit]:
+        """
+        Return the units get_data lists for a stored unit, as copies that later updates leave unchanged.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        Returns:
+            List[BaseObservableUnit]: The copies.
+        """
+        return [unit.clone()]
+
     @abstractmethod
     def remove_elements(self, units: List[BaseObservableUnit]) -> None:
         """
@@ -55,3 +72,115 @@ class BasePolicy(ABC):
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
         pass
+
+    def extend_element(self, case_id, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place instead of removing, merging and re-inserting it.
+        The policy applies extend to its stored unit and re-files it as if the extended unit had been
+        removed and passed to update, so the resulting state matches the merge path.
+        Policies that cannot do this return False without changing anything and the manager falls back to merging.
+        Args:
+            case_id: The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if a unit was extended, False otherwise.
+        """
+        return False
+
+    def pop_mergeable_elements(self, case_id, held: int = 0) -> List[BaseObservableUnit]:
+        """
+        Remove and return all mergeable observable units for a given case ID,
+        equivalent to get_mergeable_elements followed by remove_elements.
+        Policies can override this to remove the units without looking them up again.
+        Args:
+            case_id: The case identifier to filter units.
+            held (int): Units the current batch of MemoryManager.add_events holds outside the policy. A policy
+                that evicts can use it to keep units back that sequential ingestion would have evicted by now.
+        Returns:
+            List[BaseObservableUnit]: The removed units.
+        """
+        units = self.get_mergeable_elements(case_id)
+        if units:
+            self.remove_elements(units)
+        return units
+
+    def update_batch(self, units: List[BaseObservableUnit]) -> None:
+        """
+        Update the policy with several observable units, equivalent to calling update for each of them in order.
+        Policies can override this with a faster bulk update.
+        Args:
+            units (List[BaseObservableUnit]): The units to add, in stream order.
+        """
+        for unit in units:
+            self.update(unit)
+
+    def batch_capacity(self) -> Optional[int]:
+        """
+        Return how many units a batch of MemoryManager.add_events may hold outside the policy, the units it took
+        out of the policy included, before sequential ingestion would have evicted one of them. The manager asks
+        again whenever it takes units out. Grouping changes the order and number of update calls, so a deterministic
+        policy only allows it if the result is the same as for sequential ingestion.
+        Returns:
+            Optional[int]: The number of units, None if events have to be added one by one.
+        """
+        return None
+
+    def add_listener(self, listener: PolicyListener) -> None:
+        """
+        Register a listener to be notified about every unit the policy stores or drops from now on.
+        Args:
+            listener (PolicyListener): The listener.
+        """
+        self.listeners = self.listeners + (listener,)
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the policy without traversing the stored units: the shallow size of
+        the policy and its containers, which keep the capacity they grew to, plus the size of the stored
+        units and their bookkeeping, kept up to date on every insert, merge and eviction.
+        Strings shared between units, such as case IDs, are only accounted for on average through ENTRY_BYTES.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        containers = sum(value.estimated_bytes() if isinstance(value, CaseIndex) else sys.getsizeof(value)
+                         for value in vars(self).values())
+        return sys.getsizeof(self) + sys.getsizeof(vars(self)) + containers + self.unit_bytes
+
+    def _notify_added(self, unit: BaseObservableUnit) -> None:
+        """
+        Account for a stored unit and notify the listeners.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        self.unit_bytes += self._stored_bytes(unit)
+        for listener in self.listeners:
+            listener.unit_added(unit)
+
+    def _notify_changed(self, unit: BaseObservableUnit) -> None:
+        """
+        Notify the listeners that the cases a stored unit is kept for changed.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        for listener in self.listeners:
+            listener.unit_changed(unit)
+
+    def _notify_removed(self, unit: BaseObservableUnit) -> None:
+        """
+        Account for a dropped unit and notify the listeners. Must be called before the unit is changed.
+        Args:
+            unit (BaseObservableUnit): The dropped unit.
+        """
+        self.unit_bytes -= self._stored_bytes(unit)
+        for listener in self.listeners:
+            listener.unit_removed(unit)
+
+    def _stored_bytes(self, unit: BaseObservableUnit) -> int:
+        """
+        Estimate the memory a stored unit takes, including the policy's bookkeeping for it.
+        Args:
+            unit (BaseObservableUnit): The stored unit, with the same content as when it was stored.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return unit.estimated_bytes() + self.ENTRY_BYTES
@@ -1,15 +1,36 @@
-from math import exp
+import heapq
+from math import exp, log
 from time import time
-from typing import List, override, Dict, Tuple
+from typing import Callable, List, override, Dict, Tuple
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_id_list import CaseIdList
+from memory_manager.tools.case_index import CaseIndex
 
 class ExponentialDecayCountingPolicy(BasePolicy):
     """
     Memory management policy that uses exponential decay to count and manage observable units.
     Older units' weights decay over time, and the policy maintains a fixed budget.
+
+    On every update, each key's weight is multiplied by exp(-decay * (t - t_k)), where t is the time of the update
+    and t_k the time the key was last hit, and a hit adds 1. Instead of applying this to every key, the policy keeps
+    the number and the sum of update times, from which the weight of a key after any number of updates follows in O(1).
+
+    For trimming, keys are compared by their log weight without the part every key shares. What remains grows with
+    the number of updates at a rate set by the time of the key's last hit, so a ranking computed earlier is a lower
+    bound of the current one. A lazily invalidated min-heap keeps these lower bounds: trimming re-ranks the top key,
+    evicts it if its rank did not change, and otherwise pushes it back with the current rank. The rates are measured
+    from a floor below every key's last hit, raised whenever the heap is rebuilt, so keys that were not hit for a
+    while barely move. The heap is rebuilt once stale entries or re-ranked entries outnumber the keys, so update
+    and trim are O(log budget) amortized. The ranking is the same as comparing the decayed
+    weights, except among weights that would underflow to 0.0, and a case index maps every case ID to the mergeable
+    entries it occurs in.
     """
 
+    ENTRY_BYTES = 1300  # Entry tuple, case list and bookkeeping per key, measured with pympler
+    CASE_ID_BYTES = 35  # Case list slot per live case ID of a key
+    HEAP_ENTRY_BYTES = 135  # Heap tuple per entry, stale ones included until the heap is rebuilt
+
     @override
     def __init__(self, budget: int, decay: float = 0.9) -> None:
         """
@@ -20,43 +41,179 @@ class ExponentialDecayCountingPolicy(BasePolicy):
         """
         self.budget: int = budget
         self.decay: float = decay  # Decay factor: between 0 and 1
-        self.data: Dict[BaseObservableUnit, Tuple[List[str], float, float]] = {}
+        self.data: Dict[BaseObservableUnit, Tuple[CaseIdList, float, float, float, int]] = {}  # {unit: (case_ids, weight, last hit, decay offset, insertion order)}
         self.N: int = 0
+        self.start: float = time()  # Times are kept relative to this one, so sums of them stay precise
+        self.time_sum: float = 0.0  # Sum of the times of all updates
+        self.keys: Dict[int, BaseObservableUnit] = {}  # {insertion order: stored unit}
+        self.heap: List[Tuple[float, int, float, float]] = []  # (rank lower bound, insertion order, last hit, decay offset)
+        self.floor: float = 0.0  # Time at or before every stored key's last hit, from which rank rates are measured
+        self.reranked: int = 0  # Heap entries re-ranked by trim since the heap was last rebuilt
+        self.next_order: int = 0
+        self.case_index = CaseIndex()
+        self.case_id_count: int = 0  # Live case IDs over all keys, for estimated_bytes
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
-        self.N += 1
-        current_time = time()
+        """
+        Update the policy with a new observable unit.
+        Decays all weights, adds one count to the unit and trims if over budget.
+        Args:
+            unit (BaseObservableUnit): The unit to add or update.
+        """
+        self._count(unit, time() - self.start)
+        if len(self.heap) > 2 * len(self.data) + self.budget:
+            self._rebuild_heap()
+        if len(self.data) > self.budget:
+            self.trim()
 
-        # Decay all weights based on time since last update
-        for k in list(self.data.keys()):
-            case_ids, weight, last_updated = self.data[k]
-            dt = current_time - last_updated
-            decayed_weight = weight * exp(-self.decay * dt)
-            self.data[k] = (case_ids, decayed_weight, current_time if k == unit else last_updated)
+    @override
+    def update_batch(self, units: List[BaseObservableUnit]) -> None:
+        """
+        Update the policy with several observable units arriving at the same time,
+        counting all of them before trimming back to the budget.
+        Args:
+            units (List[BaseObservableUnit]): The units to add or update, in stream order.
+        """
+        current_time = time() - self.start
+        for unit in units:
+            self._count(unit, current_time)
+        if len(self.heap) > 2 * len(self.data) + self.budget:
+            self._rebuild_heap()
+        while len(self.data) > self.budget:
+            self.trim()
+
+    def _count(self, unit: BaseObservableUnit, current_time: float) -> None:
+        """
+        Decay all weights and add one count to an observable unit, adding its key if it is new.
+        Args:
+            unit (BaseObservableUnit): The unit to add or update.
+            current_time (float): The time of the update, relative to start.
+        """
+        self.N += 1
+        self.time_sum += current_time
 
+        case_id = unit.get_case_id()
         if unit in self.data:
-            case_ids, weight, _ = self.data[unit]
-            case_ids.append(unit.get_case_id())
-            case_ids = case_ids[-self.budget:]
-            self.data[unit] = (case_ids, self.data[unit][1] + 1.0, current_time)
+            case_ids, weight, last_updated, offset, order = self.data[unit]
+            dropped = case_ids.append(case_id)
+            if dropped is None:
+                self.case_id_count += 1
+            if dropped is not None and dropped not in case_ids:
+                self.case_index.remove(dropped, order)
+            weight = self._decayed(weight, last_updated, offset) + 1.0
+            self.data[unit] = (case_ids, weight, current_time, self._offset(current_time), order)
+            self._push(order)
+            self._notify_changed(self.keys[order])
         else:
-            self.data[unit] = ([unit.get_case_id()], 1.0, current_time)
+            order = self.next_order
+            self.next_order += 1
+            case_ids = CaseIdList(self.budget)
+            case_ids.append(case_id)
+            self.case_id_count += 1
+            self.data[unit] = (case_ids, 1.0, current_time, self._offset(current_time), order)
+            self.keys[order] = unit
+            self._notify_added(unit)
+            self._push(order)
+        if unit.is_mergeable():
+            self.case_index.add(case_id, order, self.keys[order])
 
-        if len(self.data) > self.budget:
-            self.trim()
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the policy, including the case IDs kept for every key and the heap entries.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return (super().estimated_bytes() + self.case_id_count * self.CASE_ID_BYTES
+                + len(self.heap) * self.HEAP_ENTRY_BYTES)
 
     def trim(self) -> None:
-        current_time = time()
+        """
+        Remove the key with the lowest decayed weight.
+        """
+        while self.heap:
+            bound, order, last_updated, offset = self.heap[0]
+            unit = self.keys.get(order)
+            if unit is None or self.data[unit][2] != last_updated or self.data[unit][3] != offset:
+                heapq.heappop(self.heap)
+                continue
+            rank = self._rank(order)
+            if rank == bound:
+                heapq.heappop(self.heap)
+                self._delete(unit)
+                return
+            heapq.heapreplace(self.heap, (rank, order, last_updated, offset))
+            self.reranked += 1
+            if self.reranked > len(self.data):
+                self._rebuild_heap()
 
-        # Use decayed weight for comparison
-        def effective_weight(entry):
-            _, weight, last_updated = self.data[entry]
-            dt = current_time - last_updated
-            return weight * exp(-self.decay * dt)
+    def _rank(self, order: int) -> float:
+        """
+        Return the current trim rank of an entry: its log weight as of trimming now, up to a term shared by all keys.
+        It never decreases as updates go by.
+        Args:
+            order (int): The insertion order of the entry.
+        Returns:
+            float: The rank.
+        """
+        _, weight, last_updated, offset, _ = self.data[self.keys[order]]
+        # Trimming decays once more by the time since the last hit, as if by one more update
+        return log(weight) + self.decay * ((self.N + 1) * (last_updated - self.floor) + offset)
 
-        min_key = min(self.data, key=effective_weight)
-        del self.data[min_key]
+    def _push(self, order: int) -> None:
+        """
+        Push the current rank of an entry onto the heap, superseding its older heap entries.
+        Args:
+            order (int): The insertion order of the entry.
+        """
+        _, _, last_updated, offset, _ = self.data[self.keys[order]]
+        heapq.heappush(self.heap, (self._rank(order), order, last_updated, offset))
+
+    def _rebuild_heap(self) -> None:
+        """
+        Drop superseded heap entries, raising the floor to the earliest last hit of the stored keys.
+        """
+        self.floor = min((last_updated for _, _, last_updated, _, _ in self.data.values()), default=self.floor)
+        self.heap = [(self._rank(order), order, last_updated, offset) for _, _, last_updated, offset, order in self.data.values()]
+        heapq.heapify(self.heap)
+        self.reranked = 0
+
+    def _offset(self, current_time: float) -> float:
+        """
+        Return the decay offset of a key hit by the current update.
+        The updates after it decay the key by exp(-decay * sum of (t - current_time)), where the sum runs over their
+        times t, which is exp(-decay * ((time_sum - N * current_time) - offset)) once they have been counted.
+        Args:
+            current_time (float): The time of the current update.
+        Returns:
+            float: The offset.
+        """
+        return self.time_sum - self.N * current_time
+
+    def _decayed(self, weight: float, last_updated: float, offset: float) -> float:
+        """
+        Return the weight of a key after all updates so far.
+        Args:
+            weight (float): The weight of the key after its last hit.
+            last_updated (float): The time of its last hit.
+            offset (float): The decay offset of its last hit.
+        Returns:
+            float: The decayed weight.
+        """
+        return weight * exp(-self.decay * (self.time_sum - self.N * last_updated - offset))
+
+    def _delete(self, unit: BaseObservableUnit) -> None:
+        """
+        Delete an entry from the policy. Its heap entries become stale and are skipped later.
+        Args:
+            unit (BaseObservableUnit): The unit to delete.
+        """
+        case_ids, _, _, _, order = self.data.pop(unit)
+        self.case_id_count -= len(case_ids)
+        for case_id in case_ids.distinct():
+            self.case_index.remove(case_id, order)
+        self._notify_removed(self.keys.pop(order))
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
@@ -67,10 +224,23 @@ class ExponentialDecayCountingPolicy(BasePolicy):
         """
         result = []
         for unit in self.data.keys():
-            for case_id in self.data[unit][0]:
-                u = unit.clone()
-                u.set_case_id(case_id)
-                result.append(u)
+            result.extend(self.expand_unit(unit))
+        return result
+
+    @override
+    def expand_unit(self, unit: BaseObservableUnit) -> List[BaseObservableUnit]:
+        """
+        Return a copy of a stored unit for every case ID it is kept for.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        Returns:
+            List[BaseObservableUnit]: The copies.
+        """
+        result = []
+        for case_id in self.data[unit][0]:
+            u = unit.clone()
+            u.set_case_id(case_id)
+            result.append(u)
         return result
 
     @override
@@ -82,12 +252,41 @@ class ExponentialDecayCountingPolicy(BasePolicy):
         """
         for unit in units:
             if unit in self.data:
-                case_ids, weight, updated = self.data[unit]
-                case_ids.remove(unit.get_case_id())
-                if len(case_ids) > 0:
-                    self.data[unit] = (case_ids, weight, updated)
+                case_ids, _, _, _, order = self.data[unit]
+                case_id = unit.get_case_id()
+                case_ids.remove(case_id)
+                self.case_id_count -= 1
+                if case_id not in case_ids:
+                    self.case_index.remove(case_id, order)
+                if len(case_ids) == 0:
+                    self._delete(unit)
                 else:
-                    del self.data[unit]
+                    self._notify_changed(self.keys[order])
+
+    @override
+    def extend_element(self, case_id, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place.
+        Only done if the case's unit was only observed in this case once, so the merge path would drop the entry anyway;
+        the entry is deleted, extended under the new case ID and counted again as a new unit.
+        Args:
+            case_id: The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the unit was extended, False if the case has to go through the merge path.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        unit = next(iter(case_units.values()))
+        if len(self.data[unit][0]) != 1:
+            return False
+        self._delete(unit)
+        if unit.get_case_id() != case_id:
+            unit.set_case_id(case_id)
+        extend(unit)
+        self.update(unit)
+        return True
 
     @override
     def get_mergeable_elements(self, case_id) -> List[BaseObservableUnit]:
@@ -99,10 +298,9 @@ class ExponentialDecayCountingPolicy(BasePolicy):
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
         ret = []
-        for unit in self.data.keys():
-            if case_id in self.data[unit][0] and unit.is_mergeable():
-                u = unit.clone()
-                u.set_case_id(case_id)
-                ret.append(u)
+        for unit in self.case_index.get_units(case_id):
+            u = unit.clone()
+            u.set_case_id(case_id)
+            ret.append(u)
         return ret
 
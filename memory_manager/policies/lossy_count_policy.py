@@ -1,69 +1,178 @@
 import math
-from typing import List, override
+from typing import Callable, Dict, List, Optional, override
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_id_list import CaseIdList
+from memory_manager.tools.case_index import CaseIndex
 
 class LossyCountPolicy(BasePolicy):
     """
     Memory management policy implementing the Lossy Counting algorithm.
     Maintains approximate frequency counts for observable units within a specified error bound (epsilon).
+
+    Each key stores its count, its delta and a bounded sample of the cases it was observed in, instead of
+    every observed unit. Keys are filed under count + delta, the bucket at which they expire, so pruning
+    at a bucket boundary only visits the keys that actually expire.
     """
 
+    ENTRY_BYTES = 1350  # Entry tuple, case list and bookkeeping per key, measured with pympler
+    CASE_ID_BYTES = 35  # Case list slot per live case ID of a key
+
     @override
-    def __init__(self, epsilon: float) -> None:
+    def __init__(self, epsilon: float, sample_size: Optional[int] = None) -> None:
         """
         Initialize the LossyCountPolicy.
         Args:
             epsilon (float): Error bound for frequency approximation (0 < epsilon < 1).
+            sample_size (Optional[int]): Maximum number of case IDs kept per key, defaults to the bucket width.
         """
         self.bucket_width = math.ceil(1 / epsilon)
-        self.data = dict()  # {unit: [[unit, ...], delta]}
+        self.sample_size: int = sample_size if sample_size is not None else self.bucket_width
+        self.data: Dict[BaseObservableUnit, tuple[int, int, CaseIdList, int]] = {}  # {unit: (count, delta, case sample, insertion order)}
         self.N = 0  # Total number of processed units
+        self.keys: Dict[int, BaseObservableUnit] = {}  # {insertion order: stored unit}
+        self.buckets: Dict[int, Dict[int, None]] = {}  # {count + delta: insertion orders}
+        self.lowest_bucket: int = 0  # No bucket below this one holds keys
+        self.next_order: int = 0
+        self.case_index = CaseIndex()
+        self.case_id_count: int = 0  # Live case IDs over all keys, for estimated_bytes
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
         """
         Update the policy with a new observable unit.
-        Adds the unit to the data structure and trims infrequent units at bucket boundaries.
+        Counts the unit and trims infrequent units at bucket boundaries.
+        Args:
+            unit (BaseObservableUnit): The unit to add or update.
+        """
+        self._count(unit)
+        if self.N % self.bucket_width == 0:
+            self.trim()
+
+    @override
+    def update_batch(self, units: List[BaseObservableUnit]) -> None:
+        """
+        Update the policy with several observable units, counting all of them before trimming
+        once if they crossed a bucket boundary.
+        Args:
+            units (List[BaseObservableUnit]): The units to add or update, in stream order.
+        """
+        bucket_id = self._bucket_id()
+        for unit in units:
+            self._count(unit)
+        if self._bucket_id() > bucket_id:
+            self.trim()
+
+    def _count(self, unit: BaseObservableUnit) -> None:
+        """
+        Count an observable unit under its key, adding the key if it is new.
         Args:
             unit (BaseObservableUnit): The unit to add or update.
         """
         self.N += 1
+        case_id = unit.get_case_id()
         if unit in self.data:
-            self.data[unit][0].append(unit)
+            count, delta, sample, order = self.data[unit]
+            self._refile(order, count + delta, count + 1 + delta)
+            dropped = sample.append(case_id)
+            if dropped is None:
+                self.case_id_count += 1
+            if dropped is not None and dropped not in sample:
+                self.case_index.remove(dropped, order)
+            self.data[unit] = (count + 1, delta, sample, order)
+            self._notify_changed(self.keys[order])
         else:
-            self.data[unit] = [[unit], self._bucket_id() - 1]
-
-        if self.N % self.bucket_width == 0:
-            self.trim()
+            order = self.next_order
+            self.next_order += 1
+            delta = self._bucket_id() - 1
+            sample = CaseIdList(self.sample_size)
+            sample.append(case_id)
+            self.case_id_count += 1
+            self.data[unit] = (1, delta, sample, order)
+            self.keys[order] = unit
+            self._notify_added(unit)
+            self._refile(order, None, 1 + delta)
+        if unit.is_mergeable():
+            self.case_index.add(case_id, order, self.keys[order])
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
         """
-        Retrieve all observable units currently managed by the policy.
+        Retrieve all observable units currently managed by the policy, one per sampled case.
         Returns:
             List[BaseObservableUnit]: The list of managed units.
         """
         units = []
-        for entry in self.data.values():
-            units.extend(entry[0])
+        for unit in self.data.keys():
+            units.extend(self.expand_unit(unit))
+        return units
+
+    @override
+    def expand_unit(self, unit: BaseObservableUnit) -> List[BaseObservableUnit]:
+        """
+        Return a copy of a stored unit for every sampled case.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        Returns:
+            List[BaseObservableUnit]: The copies.
+        """
+        units = []
+        for case_id in self.data[unit][2]:
+            u = unit.clone()
+            u.set_case_id(case_id)
+            units.append(u)
         return units
 
     @override
     def remove_elements(self, units: List[BaseObservableUnit]) -> None:
         """
         Remove the specified observable units from the policy.
+        Each removed unit takes one count and one sampled occurrence of its case from its key.
         Args:
             units (List[BaseObservableUnit]): The units to remove.
         """
         for unit in units:
             if unit in self.data:
-                unit_list = self.data[unit][0]
-                # Remove units matching both equality and case ID
-                self.data[unit][0] = [u for u in unit_list if (u != unit and u.get_case_id() != unit.get_case_id())]
-                if len(self.data[unit][0]) == 0:
-                    del self.data[unit]
+                count, delta, sample, order = self.data[unit]
+                case_id = unit.get_case_id()
+                if case_id in sample:
+                    sample.remove(case_id)
+                    self.case_id_count -= 1
+                    if case_id not in sample:
+                        self.case_index.remove(case_id, order)
+                if count == 1:
+                    self._delete(unit)
+                else:
+                    self._refile(order, count + delta, count - 1 + delta)
+                    self.data[unit] = (count - 1, delta, sample, order)
+                    self._notify_changed(self.keys[order])
+
+    @override
+    def extend_element(self, case_id, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place.
+        Only done if the case's unit was counted once, so the merge path would drop the entry anyway;
+        the entry is deleted, extended under the new case ID and counted again as a new unit.
+        Args:
+            case_id: The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the unit was extended, False if the case has to go through the merge path.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        unit = next(iter(case_units.values()))
+        count, _, sample, _ = self.data[unit]
+        if count != 1 or len(sample) != 1:
+            return False
+        self._delete(unit)
+        if unit.get_case_id() != case_id:
+            unit.set_case_id(case_id)
+        extend(unit)
+        self.update(unit)
+        return True
 
     @override
     def get_mergeable_elements(self, case_id) -> List[BaseObservableUnit]:
@@ -75,10 +184,10 @@ class LossyCountPolicy(BasePolicy):
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
         ret = []
-        for entry in self.data.values():
-            for unit in entry[0]:
-                if unit.is_mergeable() and unit.get_case_id() == case_id:
-                    ret.append(unit)
+        for unit in self.case_index.get_units(case_id):
+            u = unit.clone()
+            u.set_case_id(case_id)
+            ret.append(u)
         return ret
 
     def _bucket_id(self):
@@ -89,13 +198,64 @@ class LossyCountPolicy(BasePolicy):
         """
         return math.floor(self.N / self.bucket_width)
 
+    def _refile(self, order: int, old_bucket: Optional[int], new_bucket: int) -> None:
+        """
+        Move a key to the bucket it now expires at.
+        Args:
+            order (int): The insertion order of the key.
+            old_bucket (Optional[int]): The bucket the key was filed under, None for a new key.
+            new_bucket (int): The new count + delta of the key.
+        """
+        if old_bucket is not None:
+            self._unfile(order, old_bucket)
+        bucket = self.buckets.get(new_bucket)
+        if bucket is None:
+            self.buckets[new_bucket] = {order: None}
+        else:
+            bucket[order] = None
+        self.lowest_bucket = min(self.lowest_bucket, new_bucket)
+
+    def _unfile(self, order: int, bucket_id: int) -> None:
+        """
+        Remove a key from its bucket.
+        Args:
+            order (int): The insertion order of the key.
+            bucket_id (int): The count + delta the key is filed under.
+        """
+        bucket = self.buckets[bucket_id]
+        del bucket[order]
+        if not bucket:
+            del self.buckets[bucket_id]
+
+    def _delete(self, unit: BaseObservableUnit) -> None:
+        """
+        Delete a key with its bucket entry and case index entries.
+        Args:
+            unit (BaseObservableUnit): The key to delete.
+        """
+        count, delta, sample, order = self.data.pop(unit)
+        self.case_id_count -= len(sample)
+        self._unfile(order, count + delta)
+        for case_id in sample.distinct():
+            self.case_index.remove(case_id, order)
+        self._notify_removed(self.keys.pop(order))
+
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the policy, including the case IDs kept for every key.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return super().estimated_bytes() + self.case_id_count * self.CASE_ID_BYTES
+
     def trim(self):
         """
         Remove units whose estimated frequency is too low to be significant.
         This is done at the end of each bucket.
         """
         bucket_id = self._bucket_id()
-        items_to_remove = [item for item, (count, delta) in self.data.items() if len(count) + delta <= bucket_id]
-        for item in items_to_remove:
-            if item in self.data:
-                del self.data[item]
\ No newline at end of file
+        for expiring in range(self.lowest_bucket, bucket_id + 1):
+            for order in list(self.buckets.get(expiring, ())):
+                self._delete(self.keys[order])
+        self.lowest_bucket = bucket_id + 1
@@ -1,15 +1,29 @@
-from typing import List, override, Dict
+import heapq
+from collections import OrderedDict
+from typing import Callable, List, override, Dict
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_id_list import CaseIdList
+from memory_manager.tools.case_index import CaseIndex
 
 
 class LossyCountWithBudgetPolicy(BasePolicy):
     """
     Memory management policy that combines lossy counting with a fixed budget.
     Maintains a limited number of observable units, trimming based on frequency and recency.
+
+    The trim score len(case_ids) * 0.6 + (N - last_seen) * 0.4 only depends on N through a term shared
+    by all entries, so entries are ranked by the integer key 3 * len(case_ids) - 2 * last_seen, which
+    changes only when the entry itself changes. Entries younger than the minimum lifetime wait in a
+    FIFO ordered by last_seen and move into a lazily invalidated min-heap once they are old enough.
+    A case index maps every case ID to the mergeable entries it occurs in.
     """
 
+    ENTRY_BYTES = 1320  # Entry tuple, case list and bookkeeping per key, measured with pympler
+    CASE_ID_BYTES = 35  # Case list slot per live case ID of a key
+    HEAP_ENTRY_BYTES = 135  # Heap tuple per entry, stale ones included until the heap is rebuilt
+
     @override
     def __init__(self, budget: int) -> None:
         """
@@ -18,8 +32,14 @@ class LossyCountWithBudgetPolicy(BasePolicy):
             budget (int): Maximum number of unique keys to keep.
         """
         self.budget: int = budget
-        self.data: Dict[BaseObservableUnit, tuple[list[str], int]] = {}
+        self.data: Dict[BaseObservableUnit, tuple[CaseIdList, int, int]] = {}  # {unit: (case_ids, last_seen, insertion order)}
         self.N: int = 0
+        self.keys: Dict[int, BaseObservableUnit] = {}  # {insertion order: stored unit}
+        self.young: OrderedDict[int, None] = OrderedDict()  # Insertion orders of entries not yet in the heap, by last_seen
+        self.heap: List[tuple[int, int, int, int]] = []  # (rank key, insertion order, count, last_seen)
+        self.next_order: int = 0
+        self.case_index = CaseIndex()
+        self.case_id_count: int = 0  # Live case IDs over all keys, for estimated_bytes
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
@@ -29,41 +49,177 @@ class LossyCountWithBudgetPolicy(BasePolicy):
         Args:
             unit (BaseObservableUnit): The unit to add or update.
         """
+        self._count(unit)
+        if len(self.data) > self.budget:
+            self.trim()
+
+    @override
+    def update_batch(self, units: List[BaseObservableUnit]) -> None:
+        """
+        Update the policy with several observable units, counting all of them before trimming back to the budget.
+        Once only young entries are left to trim, the ones with the lowest scores are deleted at once,
+        as repeated trims would, instead of scanning the young entries for each of them.
+        Args:
+            units (List[BaseObservableUnit]): The units to add or update, in stream order.
+        """
+        for unit in units:
+            self._count(unit)
+        while len(self.data) > self.budget:
+            candidates = self._pop_candidates()
+            if not candidates:
+                young = [self.keys[order] for order in sorted(self.young)]
+                for unit in heapq.nsmallest(len(self.data) - self.budget, young, key=self._score):
+                    self._delete(unit)
+                return
+            min_key = min(candidates, key=self._score)
+            for unit in candidates:
+                if unit is not min_key:
+                    self._push(self.data[unit][2])
+            self._delete(min_key)
+
+    def _count(self, unit: BaseObservableUnit) -> None:
+        """
+        Count an observable unit under its key, adding the key if it is new.
+        Args:
+            unit (BaseObservableUnit): The unit to add or update.
+        """
         self.N += 1
+        case_id = unit.get_case_id()
         if unit in self.data:
-            lst = self.data[unit][0]
-            lst.append(unit.get_case_id())
-            lst = lst[-self.budget:]
-            self.data[unit] = (lst, self.N)
+            lst, _, order = self.data[unit]
+            dropped = lst.append(case_id)
+            if dropped is None:
+                self.case_id_count += 1
+            if dropped is not None and dropped not in lst:
+                self.case_index.remove(dropped, order)
+            self.data[unit] = (lst, self.N, order)
+            self.young.pop(order, None)
+            self._notify_changed(self.keys[order])
         else:
-            self.data[unit] = ([unit.get_case_id()], self.N)
+            order = self.next_order
+            self.next_order += 1
+            lst = CaseIdList(self.budget)
+            lst.append(case_id)
+            self.case_id_count += 1
+            self.data[unit] = (lst, self.N, order)
+            self.keys[order] = unit
+            self._notify_added(unit)
+        self.young[order] = None
+        if unit.is_mergeable():
+            self.case_index.add(case_id, order, self.keys[order])
 
-        if len(self.data) > self.budget:
-            self.trim()
+    @override
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the policy, including the case IDs kept for every key and the heap entries.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return (super().estimated_bytes() + self.case_id_count * self.CASE_ID_BYTES
+                + len(self.heap) * self.HEAP_ENTRY_BYTES)
 
     def trim(self) -> None:
         """
         Remove the least valuable entry to maintain the budget.
         Uses a weighted score of frequency and recency.
         """
-        alpha = 0.6
-        min_lifetime = (self.budget // 3) * 2
-
-        # Filter out entries that are too new to be trimmed
-        candidates = {
-            k: v for k, v in self.data.items()
-            if (self.N - v[1]) > min_lifetime
-        }
+        candidates = self._pop_candidates()
 
         # If no candidates to trim, fall back to oldest anyway
         if not candidates:
-            candidates = self.data
+            candidates = [self.keys[order] for order in sorted(self.young)]
+
+        # Candidates share the minimal rank key; the original float score breaks any remaining ties
+        min_key = min(candidates, key=self._score)
+        for unit in candidates:
+            order = self.data[unit][2]
+            if unit is not min_key and order not in self.young:
+                self._push(order)
+        self._delete(min_key)
+
+    def _pop_candidates(self) -> List[BaseObservableUnit]:
+        """
+        Move the entries that are old enough into the heap and pop the current entries sharing the minimal rank key.
+        Returns:
+            List[BaseObservableUnit]: The trim candidates, empty if only young entries are left.
+        """
+        min_lifetime = (self.budget // 3) * 2
+        threshold = self.N - min_lifetime
+        while self.young:
+            order = next(iter(self.young))
+            if self.data[self.keys[order]][1] >= threshold:
+                break
+            del self.young[order]
+            self._push(order)
+        return [self.keys[order] for order in self._pop_min_rank()]
+
+    def _score(self, unit: BaseObservableUnit) -> float:
+        """
+        Return the weighted trim score of an entry, lower scores are trimmed first.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        Returns:
+            float: The score.
+        """
+        alpha = 0.6
+        return len(self.data[unit][0]) * alpha + (self.N - self.data[unit][1]) * (1 - alpha)
 
-        min_key = min(
-            candidates,
-            key=lambda k: len(self.data[k][0]) * alpha + (self.N - self.data[k][1]) * (1 - alpha)
-        )
-        del self.data[min_key]
+    def _push(self, order: int) -> None:
+        """
+        Push the current rank of a trim candidate onto the heap, superseding its older entries.
+        Args:
+            order (int): The insertion order of the candidate entry.
+        """
+        case_ids, last_seen, _ = self.data[self.keys[order]]
+        heapq.heappush(self.heap, (3 * len(case_ids) - 2 * last_seen, order, len(case_ids), last_seen))
+
+    def _is_current(self, entry: tuple[int, int, int, int]) -> bool:
+        """
+        Check whether a heap entry still describes its unit.
+        Args:
+            entry: The heap entry.
+        Returns:
+            bool: True if the entry is still stored with the same count and last_seen.
+        """
+        _, order, count, last_seen = entry
+        unit = self.keys.get(order)
+        if unit is None:
+            return False
+        current = self.data[unit]
+        return current[1] == last_seen and len(current[0]) == count
+
+    def _pop_min_rank(self) -> List[int]:
+        """
+        Pop all current heap entries sharing the minimal rank key.
+        Returns:
+            List[int]: The insertion orders of the popped entries in ascending order, empty if the heap has no current entry.
+        """
+        ret = []
+        while self.heap:
+            entry = self.heap[0]
+            if not self._is_current(entry):
+                heapq.heappop(self.heap)
+            elif ret and entry[0] != ret[0][0]:
+                break
+            else:
+                ret.append(heapq.heappop(self.heap))
+        return [entry[1] for entry in ret]
+
+    def _delete(self, unit: BaseObservableUnit) -> None:
+        """
+        Delete an entry from the policy. Its heap entries become stale and are skipped later.
+        Args:
+            unit (BaseObservableUnit): The unit to delete.
+        """
+        lst, _, order = self.data.pop(unit)
+        self.case_id_count -= len(lst)
+        for case_id in lst.distinct():
+            self.case_index.remove(case_id, order)
+        self._notify_removed(self.keys.pop(order))
+        self.young.pop(order, None)
+        if len(self.heap) > 2 * len(self.data) + self.budget:
+            self.heap = [entry for entry in self.heap if self._is_current(entry)]
+            heapq.heapify(self.heap)
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
@@ -74,10 +230,23 @@ class LossyCountWithBudgetPolicy(BasePolicy):
         """
         units = []
         for unit in self.data.keys():
-            for case_id in self.data[unit][0]:
-                u = unit.clone()
-                u.set_case_id(case_id)
-                units.append(u)
+            units.extend(self.expand_unit(unit))
+        return units
+
+    @override
+    def expand_unit(self, unit: BaseObservableUnit) -> List[BaseObservableUnit]:
+        """
+        Return a copy of a stored unit for every case ID it is kept for.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        Returns:
+            List[BaseObservableUnit]: The copies.
+        """
+        units = []
+        for case_id in self.data[unit][0]:
+            u = unit.clone()
+            u.set_case_id(case_id)
+            units.append(u)
         return units
 
     @override
@@ -89,12 +258,43 @@ class LossyCountWithBudgetPolicy(BasePolicy):
         """
         for unit in units:
             if unit in self.data:
-                lst, n = self.data[unit]
-                lst.remove(unit.get_case_id())
+                lst, n, order = self.data[unit]
+                case_id = unit.get_case_id()
+                lst.remove(case_id)
+                self.case_id_count -= 1
+                if case_id not in lst:
+                    self.case_index.remove(case_id, order)
                 if len(lst) == 0:
-                    del self.data[unit]
+                    self._delete(unit)
                 else:
-                    self.data[unit] = (lst, n)
+                    if order not in self.young:
+                        self._push(order)
+                    self._notify_changed(self.keys[order])
+
+    @override
+    def extend_element(self, case_id, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place.
+        Only done if the case's unit was only observed in this case once, so the merge path would drop the entry anyway;
+        the entry is deleted, extended under the new case ID and counted again as a new unit.
+        Args:
+            case_id: The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the unit was extended, False if the case has to go through the merge path.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        unit = next(iter(case_units.values()))
+        if len(self.data[unit][0]) != 1:
+            return False
+        self._delete(unit)
+        if unit.get_case_id() != case_id:
+            unit.set_case_id(case_id)
+        extend(unit)
+        self.update(unit)
+        return True
 
     @override
     def get_mergeable_elements(self, case_id) -> List[BaseObservableUnit]:
@@ -106,9 +306,8 @@ class LossyCountWithBudgetPolicy(BasePolicy):
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
         ret = []
-        for unit in self.data.keys():
-            if unit.is_mergeable() and case_id in self.data[unit][0]:
-                u = unit.clone()
-                u.set_case_id(case_id)
-                ret.append(u)
-        return ret
\ No newline at end of file
+        for unit in self.case_index.get_units(case_id):
+            u = unit.clone()
+            u.set_case_id(case_id)
+            ret.append(u)
+        return ret
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+
+from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+
+
+class PolicyListener(ABC):
+    """
+    Abstract base class for objects following the units a policy stores.
+    A policy notifies its listeners whenever a unit is stored and whenever a stored unit is removed, merged away,
+    evicted or about to be extended in place, so listeners can maintain derived data incrementally.
+    Counting policies store each distinct unit once, so they notify once per distinct unit, not per case,
+    and notify unit_changed when only the cases a stored unit is kept for change.
+    """
+
+    @abstractmethod
+    def unit_added(self, unit: BaseObservableUnit) -> None:
+        """
+        Called after the policy stored a unit.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        pass
+
+    @abstractmethod
+    def unit_removed(self, unit: BaseObservableUnit) -> None:
+        """
+        Called after the policy dropped a stored unit, before the unit is changed in any way.
+        Args:
+            unit (BaseObservableUnit): The dropped unit, with the same content it was added with.
+        """
+        pass
+
+    def unit_changed(self, unit: BaseObservableUnit) -> None:
+        """
+        Called after the policy changed the cases a stored unit is kept for, without changing the unit itself.
+        Ignored unless a listener follows the cases.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        pass
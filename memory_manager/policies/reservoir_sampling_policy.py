@@ -1,61 +1,180 @@
-from typing import List, override
+from math import exp, floor, log, log1p
+from typing import Callable, Dict, List, Optional, override
 import random
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_index import CaseIndex
 
 
 class ReservoirSamplingPolicy(BasePolicy):
     """
     Memory management policy implementing reservoir sampling.
     Maintains a random sample of observable units up to a fixed budget.
+
+    Once the reservoir is full, the policy uses Algorithm L: instead of drawing a random number for every
+    unit, it draws how many units to skip before the next one is accepted, so random numbers are only
+    drawn for accepted units. The sample stays uniform over all units seen.
     """
 
+    ENTRY_BYTES = 90  # Handle, position entry and the unit's share of strings, measured with pympler
+
     @override
-    def __init__(self, budget: int) -> None:
+    def __init__(self, budget: int, seed: Optional[int] = None) -> None:
         """
         Initialize the ReservoirSamplingPolicy.
         Args:
             budget (int): Maximum number of units to keep in the reservoir.
+            seed (Optional[int]): Seed of the policy's random generator, for reproducible runs.
         """
         self.budget: int = budget
         self.data: List[BaseObservableUnit] = []
         self.N: int = 0  # Total elements seen
+        self.case_index = CaseIndex()
+        self.handles: List[int] = []  # Handle of the unit at the same position in data
+        self.positions: Dict[int, int] = {}  # {handle: position in data}
+        self.next_handle: int = 0
+        self.random = random.Random(seed)
+        self.w: float = exp(log(self._uniform()) / budget) if budget > 0 else 0.0
+        self.next_accept: Optional[int] = None  # Value of N at which the next unit is accepted once full
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
         """
         Update the policy with a new observable unit.
-        Adds the unit to the reservoir or replaces an existing one at random if over budget.
+        Adds the unit to the reservoir, or replaces an existing one at random if it is the next accepted unit.
         Args:
             unit (BaseObservableUnit): The unit to add or update.
         """
         self.N += 1
         if len(self.data) < self.budget:
-            self.data.append(unit)
-        else:
-            replace_idx = random.randint(0, self.N - 1)
-            if replace_idx < self.budget:
-                self.data[replace_idx] = unit
+            self._insert(unit)
+            if len(self.data) == self.budget and (self.next_accept is None or self.next_accept <= self.N):
+                self._schedule()
+        elif self.next_accept is not None and self.N >= self.next_accept:
+            self._remove_at(self.random.randrange(self.budget))
+            self._insert(unit)
+            self.w *= exp(log(self._uniform()) / self.budget)
+            self._schedule()
+
+    def _uniform(self) -> float:
+        """
+        Draw a uniform random number from the open interval (0, 1).
+        Returns:
+            float: The random number.
+        """
+        u = self.random.random()
+        while u == 0.0:
+            u = self.random.random()
+        return u
+
+    def _schedule(self) -> None:
+        """
+        Draw the number of units to skip and set the position of the next accepted unit.
+        """
+        self.next_accept = self.N + floor(log(self._uniform()) / log1p(-self.w)) + 1
+
+    def _insert(self, unit: BaseObservableUnit) -> None:
+        """
+        Append a unit to the reservoir and register it in the case index if it can be merged later.
+        Args:
+            unit (BaseObservableUnit): The unit to store.
+        """
+        handle = self.next_handle
+        self.next_handle += 1
+        self.positions[handle] = len(self.data)
+        self.data.append(unit)
+        self.handles.append(handle)
+        if unit.is_mergeable():
+            self.case_index.add(unit.get_case_id(), handle, unit)
+        self._notify_added(unit)
+
+    def _remove_at(self, position: int) -> None:
+        """
+        Remove the unit at a position by moving the last unit into its place.
+        Args:
+            position (int): The position of the unit in data.
+        """
+        unit = self.data[position]
+        handle = self.handles[position]
+        self.case_index.remove(unit.get_case_id(), handle)
+        del self.positions[handle]
+        last_unit = self.data.pop()
+        last_handle = self.handles.pop()
+        if position < len(self.data):
+            self.data[position] = last_unit
+            self.handles[position] = last_handle
+            self.positions[last_handle] = position
+        self._notify_removed(unit)
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
         """
         Retrieve all observable units currently managed by the policy.
         Returns:
-            List[BaseObservableUnit]: The list of managed units.
+            List[BaseObservableUnit]: A copy of the list of managed units.
         """
-        return self.data
+        return list(self.data)
 
     @override
     def remove_elements(self, units: List[BaseObservableUnit]) -> None:
         """
         Remove the specified observable units from the policy.
+        Only mergeable units are looked up, since these are the ones handed out by get_mergeable_elements.
         Args:
             units (List[BaseObservableUnit]): The units to remove.
         """
-        to_remove = set((u.get_case_id(), u) for u in units)
-        self.data = [u for u in self.data if (u.get_case_id(), u) not in to_remove]
+        for rem in units:
+            for handle, u in list(self.case_index.get(rem.get_case_id()).items()):
+                if u == rem:
+                    self._remove_at(self.positions[handle])
+
+    @override
+    def extend_element(self, case_id, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place. Like a merged unit, it counts as a new unit and refills its own slot.
+        Args:
+            case_id: The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the case had exactly one open unit, which was extended.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        handle, unit = next(iter(case_units.items()))
+        self._remove_at(self.positions[handle])
+        extend(unit)
+        self.update(unit)
+        return True
+
+    @override
+    def pop_mergeable_elements(self, case_id, held: int = 0) -> List[BaseObservableUnit]:
+        """
+        Remove and return all mergeable observable units for a given case ID, using the case index.
+        Args:
+            case_id: The case identifier to filter units.
+            held (int): Units the current batch holds outside the policy, unused since nothing is evicted meanwhile.
+        Returns:
+            List[BaseObservableUnit]: The removed units.
+        """
+        units = []
+        for handle, unit in list(self.case_index.get(case_id).items()):
+            self._remove_at(self.positions[handle])
+            units.append(unit)
+        return units
+
+    @override
+    def batch_capacity(self) -> Optional[int]:
+        """
+        Return the free room in the reservoir, counting the units taken out of it, since grouped events are exact
+        as long as no unit has to win a slot. Once the reservoir is full, every continued case must compete
+        for its slot like in sequential ingestion.
+        Returns:
+            Optional[int]: The number of units that fit without replacement, None once the reservoir is full.
+        """
+        free = self.budget - len(self.data)
+        return free if free > 0 else None
 
     @override
     def get_mergeable_elements(self, case_id) -> List[BaseObservableUnit]:
@@ -66,4 +185,4 @@ class ReservoirSamplingPolicy(BasePolicy):
         Returns:
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
-        return [u for u in self.data if u.get_case_id() == case_id and u.is_mergeable()]
+        return self.case_index.get_units(case_id)
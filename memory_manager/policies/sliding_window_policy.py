@@ -1,17 +1,23 @@
-from typing import List
+from collections import OrderedDict
+from typing import Callable, List, Optional
 
 from typing_extensions import override
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_index import CaseIndex
 
 
 class SlidingWindowPolicy(BasePolicy):
     """
     Memory management policy implementing a sliding window.
     Maintains only the most recent observable units up to a fixed window size.
+    Units are stored in insertion order under a running sequence number, so appending,
+    evicting the oldest unit and removing a merged unit are all O(1).
     """
 
+    ENTRY_BYTES = 40  # Sequence number and the unit's share of strings, measured with pympler
+
     @override
     def __init__(self, window_size: int) -> None:
         """
@@ -21,7 +27,11 @@ class SlidingWindowPolicy(BasePolicy):
         """
         super().__init__()
         self.window_size = window_size
-        self.data: List[BaseObservableUnit] = []
+        self.data: OrderedDict[int, BaseObservableUnit] = OrderedDict()  # {sequence number: unit}
+        self.case_index = CaseIndex()
+        self.next_key: int = 0
+        self.doomed: int = 0  # Units of the current batch that sequential ingestion would have evicted
+        self.doomed_before: Optional[int] = None  # Sequence number below which every stored unit is doomed
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
@@ -30,7 +40,7 @@ class SlidingWindowPolicy(BasePolicy):
         Returns:
             List[BaseObservableUnit]: The list of managed units.
         """
-        return self.data
+        return list(self.data.values())
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
@@ -40,23 +50,107 @@ class SlidingWindowPolicy(BasePolicy):
         Args:
             unit (BaseObservableUnit): The unit to add.
         """
-        self.data.append(unit)
-        self.data = self.data[-self.window_size:]
+        key = self.next_key
+        self.next_key += 1
+        self.data[key] = unit
+        if unit.is_mergeable():
+            self.case_index.add(unit.get_case_id(), key, unit)
+        self._notify_added(unit)
+        while len(self.data) > self.window_size:
+            evicted_key, evicted = self.data.popitem(last=False)
+            self.case_index.remove(evicted.get_case_id(), evicted_key)
+            self._notify_removed(evicted)
 
     @override
     def remove_elements(self, units: List[BaseObservableUnit]) -> None:
         """
         Remove the specified observable units from the policy.
+        Only mergeable units are looked up, since these are the ones handed out by get_mergeable_elements.
         Args:
             units (List[BaseObservableUnit]): The units to remove.
         """
-        self.data[:] = [
-            u for u in self.data
-            if all(
-                not (u == rem and u.get_case_id() == rem.get_case_id())
-                for rem in units
-            )
-        ]
+        for rem in units:
+            case_id = rem.get_case_id()
+            for key, u in list(self.case_index.get(case_id).items()):
+                if u == rem:
+                    self.case_index.remove(case_id, key)
+                    del self.data[key]
+                    self._notify_removed(u)
+
+    @override
+    def extend_element(self, case_id: str, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place and move it to the newest end of the window.
+        Args:
+            case_id (str): The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the case had exactly one open unit, which was extended.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        key, unit = next(iter(case_units.items()))
+        self.case_index.remove(case_id, key)
+        del self.data[key]
+        self._notify_removed(unit)
+        extend(unit)
+        self.update(unit)
+        return True
+
+    @override
+    def pop_mergeable_elements(self, case_id, held: int = 0) -> List[BaseObservableUnit]:
+        """
+        Remove and return all mergeable observable units for a given case ID, using the case index.
+        Units that sequential ingestion would have evicted by now, given the units the current batch holds,
+        are left in place as the oldest units, so update_batch evicts them first.
+        Args:
+            case_id: The case identifier to filter units.
+            held (int): Units the current batch holds outside the policy.
+        Returns:
+            List[BaseObservableUnit]: The removed units.
+        """
+        # Handlers never shrink the window with an event, so sequential ingestion has evicted just enough
+        # of the oldest untouched units to fit the held ones
+        if len(self.data) - self.doomed + held > self.window_size and self.doomed < len(self.data):
+            if self.doomed_before is None:
+                self.doomed_before = next(iter(self.data))
+            while len(self.data) - self.doomed + held > self.window_size and self.doomed < len(self.data):
+                while self.doomed_before not in self.data:
+                    self.doomed_before += 1
+                self.doomed_before += 1
+                self.doomed += 1
+        units = []
+        for key, unit in list(self.case_index.get(case_id).items()):
+            if self.doomed_before is not None and key < self.doomed_before:
+                continue
+            self.case_index.remove(case_id, key)
+            del self.data[key]
+            self._notify_removed(unit)
+            units.append(unit)
+        return units
+
+    @override
+    def update_batch(self, units: List[BaseObservableUnit]) -> None:
+        """
+        Update the policy with the units of a batch, which evicts the units pop_mergeable_elements left in place.
+        Args:
+            units (List[BaseObservableUnit]): The units to add, in stream order.
+        """
+        self.doomed = 0
+        self.doomed_before = None
+        super().update_batch(units)
+
+    @override
+    def batch_capacity(self) -> Optional[int]:
+        """
+        Return the window size. Extended and merged units only move to the newest end of the window and
+        pop_mergeable_elements leaves units in place that would have been evicted, so a batch stays exact
+        as long as the window has room for the units it holds.
+        Returns:
+            Optional[int]: The number of units a batch may hold.
+        """
+        return self.window_size
 
     @override
     def get_mergeable_elements(self, case_id: str) -> List[BaseObservableUnit]:
@@ -67,4 +161,4 @@ class SlidingWindowPolicy(BasePolicy):
         Returns:
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
-        return [x for x in self.data if x.is_mergeable() and x.get_case_id() == case_id]
+        return self.case_index.get_units(case_id)
@@ -1,17 +1,22 @@
-from typing import List
+from typing import Callable, Dict, List, Optional
 
 from typing_extensions import override
 
 from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
 from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.tools.case_index import CaseIndex
 
 
 class TumblingWindowPolicy(BasePolicy):
     """
     Memory management policy implementing a tumbling window.
     Maintains a batch of observable units up to a fixed window size, then starts a new batch.
+    Units are stored in insertion order under a running sequence number, so removing a merged unit
+    or moving an extended unit to the end of the batch is O(1).
     """
 
+    ENTRY_BYTES = 40  # Sequence number and the unit's share of strings, measured with pympler
+
     @override
     def __init__(self, window_size: int) -> None:
         """
@@ -21,7 +26,9 @@ class TumblingWindowPolicy(BasePolicy):
         """
         super().__init__()
         self.window_size = window_size
-        self.data: List[BaseObservableUnit] = []
+        self.data: Dict[int, BaseObservableUnit] = {}  # {sequence number: unit}
+        self.case_index = CaseIndex()
+        self.next_key: int = 0
 
     @override
     def update(self, unit: BaseObservableUnit) -> None:
@@ -31,9 +38,17 @@ class TumblingWindowPolicy(BasePolicy):
         Args:
             unit (BaseObservableUnit): The unit to add.
         """
-        self.data.append(unit)
-        if len(self.data) > self.window_size:
-            self.data = [unit]
+        key = self.next_key
+        self.next_key += 1
+        if len(self.data) >= self.window_size:
+            for stored in self.data.values():
+                self._notify_removed(stored)
+            self.data = {}
+            self.case_index.clear()
+        self.data[key] = unit
+        if unit.is_mergeable():
+            self.case_index.add(unit.get_case_id(), key, unit)
+        self._notify_added(unit)
 
     @override
     def get_data(self) -> List[BaseObservableUnit]:
@@ -42,22 +57,72 @@ class TumblingWindowPolicy(BasePolicy):
         Returns:
             List[BaseObservableUnit]: The list of managed units.
         """
-        return self.data
+        return list(self.data.values())
 
     @override
     def remove_elements(self, units: List[BaseObservableUnit]) -> None:
         """
         Remove the specified observable units from the policy.
+        Only mergeable units are looked up, since these are the ones handed out by get_mergeable_elements.
         Args:
             units (List[BaseObservableUnit]): The units to remove.
         """
-        self.data[:] = [
-            u for u in self.data
-            if all(
-                not (u == rem and u.get_case_id() == rem.get_case_id())
-                for rem in units
-            )
-        ]
+        for rem in units:
+            case_id = rem.get_case_id()
+            for key, u in list(self.case_index.get(case_id).items()):
+                if u == rem:
+                    self.case_index.remove(case_id, key)
+                    del self.data[key]
+                    self._notify_removed(u)
+
+    @override
+    def extend_element(self, case_id: str, extend: Callable[[BaseObservableUnit], None]) -> bool:
+        """
+        Extend the open unit of a case in place and move it to the end of the current batch.
+        Args:
+            case_id (str): The case identifier of the new event.
+            extend (Callable[[BaseObservableUnit], None]): Appends the new event to a unit in place.
+        Returns:
+            bool: True if the case had exactly one open unit, which was extended.
+        """
+        case_units = self.case_index.get(case_id)
+        if len(case_units) != 1:
+            return False
+        key, unit = next(iter(case_units.items()))
+        self.case_index.remove(case_id, key)
+        del self.data[key]
+        self._notify_removed(unit)
+        extend(unit)
+        self.update(unit)
+        return True
+
+    @override
+    def pop_mergeable_elements(self, case_id, held: int = 0) -> List[BaseObservableUnit]:
+        """
+        Remove and return all mergeable observable units for a given case ID, using the case index.
+        Args:
+            case_id: The case identifier to filter units.
+            held (int): Units the current batch holds outside the policy, unused since nothing is evicted meanwhile.
+        Returns:
+            List[BaseObservableUnit]: The removed units.
+        """
+        units = []
+        for key, unit in list(self.case_index.get(case_id).items()):
+            self.case_index.remove(case_id, key)
+            del self.data[key]
+            self._notify_removed(unit)
+            units.append(unit)
+        return units
+
+    @override
+    def batch_capacity(self) -> Optional[int]:
+        """
+        Return the free room in the current batch, counting the units taken out of it. Extended and merged units
+        only move to the end of the batch, so a full window can still group events as long as they do not add units.
+        Returns:
+            Optional[int]: The number of units that fit without starting a new batch.
+        """
+        return self.window_size - len(self.data)
 
     @override
     def get_mergeable_elements(self, case_id) -> List[BaseObservableUnit]:
@@ -68,4 +133,4 @@ class TumblingWindowPolicy(BasePolicy):
         Returns:
             List[BaseObservableUnit]: The list of mergeable units for the case.
         """
-        return [x for x in self.data if x.is_mergeable() and x.get_case_id() == case_id]
+        return self.case_index.get_units(case_id)
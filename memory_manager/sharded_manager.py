@@ -0,0 +1,209 @@
+import multiprocessing
+import pickle
+from datetime import datetime
+from multiprocessing.connection import Connection
+from typing import Callable, Iterable, List, Optional, Tuple
+from zlib import crc32
+
+from pybeamline.bevent import BEvent
+
+from memory_manager.manager import MemoryManager
+from memory_manager.observable_unit_tools.handlers.base_observable_unit_handler import BaseObservableUnitHandler
+from memory_manager.policies.base_policy import BasePolicy
+
+EventTuple = Tuple[str, str, Optional[str], Optional[datetime]]  # (event name, case ID, process name, event time)
+
+ADD = "add"
+GET = "get"
+CLOSE = "close"
+
+
+def _to_tuple(event: BEvent) -> EventTuple:
+    """
+    Flatten an event for sending it to another process, which is much cheaper to pickle than a BEvent.
+    Args:
+        event (BEvent): The event.
+    Returns:
+        EventTuple: The event name, case ID, process name and event time.
+    """
+    return event.get_event_name(), event.get_trace_name(), event.get_process_name(), event.get_event_time()
+
+
+def _to_event(event: EventTuple) -> BEvent:
+    """
+    Rebuild an event flattened by _to_tuple.
+    Args:
+        event (EventTuple): The flattened event.
+    Returns:
+        BEvent: The event.
+    """
+    return BEvent(*event)
+
+
+def _run_shard(connection: Connection, policy_factory: Callable[[], BasePolicy],
+               handler_factory: Callable[[], BaseObservableUnitHandler]) -> None:
+    """
+    Serve one shard: feed received event batches to a MemoryManager and answer data requests, until closed.
+    Every data request is answered with a pair (error, events). Once the manager has raised, the shard stops
+    ingesting and answers every data request with that exception, so the parent can raise it.
+    Args:
+        connection (Connection): The shard's end of the pipe to the ShardedMemoryManager.
+        policy_factory (Callable[[], BasePolicy]): Creates the shard's policy.
+        handler_factory (Callable[[], BaseObservableUnitHandler]): Creates the shard's handler.
+    """
+    error: Optional[BaseException] = None
+    try:
+        manager = MemoryManager(policy_factory(), handler_factory())
+    except Exception as e:
+        error = e
+    while True:
+        command, payload = connection.recv()
+        if command == ADD:
+            if error is None:
+                try:
+                    manager.add_events([_to_event(event) for event in payload])
+                except Exception as e:
+                    error = e
+        elif command == GET:
+            events = []
+            if error is None:
+                try:
+                    events = [_to_tuple(event) for event in manager.get_data()]
+                except Exception as e:
+                    error = e
+            _send_response(connection, error, events)
+        else:
+            break
+    connection.close()
+
+
+def _send_response(connection: Connection, error: Optional[BaseException], events: List[EventTuple]) -> None:
+    """
+    Answer a data request, replacing an exception that cannot be pickled by a RuntimeError describing it.
+    Args:
+        connection (Connection): The shard's end of the pipe to the ShardedMemoryManager.
+        error (Optional[BaseException]): The exception the shard's manager raised, if any.
+        events (List[EventTuple]): The managed events of the shard.
+    """
+    try:
+        connection.send((error, events))
+    except (AttributeError, TypeError, pickle.PicklingError):
+        connection.send((RuntimeError(f"Shard failed with {error!r}"), []))
+
+
+class ShardedMemoryManager:
+    """
+    Memory manager spreading the stream over several worker processes, each running its own MemoryManager.
+    All merging is done per case, so every case is routed to one shard by the CRC32 of its case ID and the
+    shards never need to talk to each other. Events are buffered per shard and sent over pipes in batches,
+    and get_data gathers the summaries of all shards.
+
+    If a shard's manager raises, the shard keeps the exception and get_data raises it in the parent.
+
+    Each shard gets its own policy, so its budget should be the total budget divided by the number of shards.
+    The factories are called in the worker processes; with the "spawn" start method they must be picklable,
+    e.g. functools.partial(SlidingWindowPolicy, 25) instead of a lambda.
+    """
+
+    def __init__(self, policy_factory: Callable[[], BasePolicy], handler_factory: Callable[[], BaseObservableUnitHandler],
+                 num_shards: int, batch_size: int = 1024) -> None:
+        """
+        Start the shard processes.
+        Args:
+            policy_factory (Callable[[], BasePolicy]): Creates the policy of a shard, with a share of the budget.
+            handler_factory (Callable[[], BaseObservableUnitHandler]): Creates the handler of a shard.
+            num_shards (int): Number of worker processes.
+            batch_size (int): Number of events buffered per shard before they are sent.
+        """
+        self.num_shards: int = num_shards
+        self.batch_size: int = batch_size
+        self.buffers: List[List[EventTuple]] = [[] for _ in range(num_shards)]
+        self.connections: List[Connection] = []
+        self.processes: List[multiprocessing.Process] = []
+        for _ in range(num_shards):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_shard, args=(child_connection, policy_factory, handler_factory), daemon=True)
+            process.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.processes.append(process)
+
+    def shard_of(self, case_id: str) -> int:
+        """
+        Return the shard a case is routed to.
+        Args:
+            case_id (str): The case identifier.
+        Returns:
+            int: The shard index.
+        """
+        return crc32(str(case_id).encode()) % self.num_shards
+
+    def add_event(self, event: BEvent) -> None:
+        """
+        Add a new event, buffering it for the shard of its case.
+        Args:
+            event (BEvent): The event to add.
+        """
+        shard = self.shard_of(event.get_trace_name())
+        buffer = self.buffers[shard]
+        buffer.append(_to_tuple(event))
+        if len(buffer) >= self.batch_size:
+            self._flush(shard)
+
+    def add_events(self, events: Iterable[BEvent]) -> None:
+        """
+        Add several events, in stream order.
+        Args:
+            events (Iterable[BEvent]): The events to add.
+        """
+        for event in events:
+            self.add_event(event)
+
+    def _flush(self, shard: int) -> None:
+        """
+        Send the buffered events of a shard.
+        Args:
+            shard (int): The shard index.
+        """
+        if self.buffers[shard]:
+            self.connections[shard].send((ADD, self.buffers[shard]))
+            self.buffers[shard] = []
+
+    def get_data(self) -> List[BEvent]:
+        """
+        Retrieve all managed events of all shards, shard by shard.
+        Buffered events are sent first, so the result covers every event added so far.
+        Returns:
+            List[BEvent]: The list of managed events.
+        Raises:
+            Exception: Whatever a shard's manager raised while ingesting or converting its summary.
+        """
+        for shard in range(self.num_shards):
+            self._flush(shard)
+            self.connections[shard].send((GET, None))
+        responses = [connection.recv() for connection in self.connections]
+        ret = []
+        for error, events in responses:
+            if error is not None:
+                raise error
+            ret.extend(_to_event(event) for event in events)
+        return ret
+
+    def close(self) -> None:
+        """
+        Stop the shard processes. Their summaries and the buffered events are discarded, so call get_data first to keep them.
+        """
+        for connection, process in zip(self.connections, self.processes):
+            if process.is_alive():
+                connection.send((CLOSE, None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self) -> "ShardedMemoryManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
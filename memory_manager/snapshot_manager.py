@@ -0,0 +1,160 @@
+from itertools import chain, islice
+from typing import Dict, Iterable, List, NamedTuple, Tuple, override
+
+from pybeamline.bevent import BEvent
+
+from memory_manager.manager import MemoryManager
+from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+from memory_manager.policies.base_policy import BasePolicy
+from memory_manager.policies.policy_listener import PolicyListener
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable summary published by a SnapshotMemoryManager.
+    """
+    version: int  # Number of snapshots published before this one
+    event_count: int  # Number of events added when the snapshot was taken
+    units: Tuple[BaseObservableUnit, ...]  # Copies of the managed units, never changed after publication
+
+
+class _UnitCopies(PolicyListener):
+    """
+    Copy of every unit a policy stores, taken whenever the policy stores or changes it and never changed afterwards,
+    so any number of snapshots can share the copies of the units the writer did not touch in between.
+    """
+
+    def __init__(self, policy: BasePolicy) -> None:
+        """
+        Initialize empty copies.
+        Args:
+            policy (BasePolicy): The policy to follow, which must not hold any units yet.
+        """
+        self.policy: BasePolicy = policy
+        self.copies: Dict[int, List[BaseObservableUnit]] = {}  # {id of the stored unit: copies get_data would list}
+
+    @override
+    def unit_added(self, unit: BaseObservableUnit) -> None:
+        """
+        Copy a stored unit.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        self.copies[id(unit)] = self.policy.expand_unit(unit)
+
+    @override
+    def unit_removed(self, unit: BaseObservableUnit) -> None:
+        """
+        Drop the copies of a dropped unit. Published snapshots keep them.
+        Args:
+            unit (BaseObservableUnit): The dropped unit.
+        """
+        del self.copies[id(unit)]
+
+    @override
+    def unit_changed(self, unit: BaseObservableUnit) -> None:
+        """
+        Copy a stored unit again after the cases it is kept for changed.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        self.copies[id(unit)] = self.policy.expand_unit(unit)
+
+    def freeze(self) -> Tuple[BaseObservableUnit, ...]:
+        """
+        Return the current copies.
+        Returns:
+            Tuple[BaseObservableUnit, ...]: The copies, in the order the units were last stored or changed.
+        """
+        return tuple(chain.from_iterable(self.copies.values()))
+
+
+class SnapshotMemoryManager:
+    """
+    Thread-safe front-end for a MemoryManager with one writer thread and any number of reader threads.
+
+    The writer adds events and, every publish_every events, publishes an immutable Snapshot by replacing a single
+    reference. Readers only read that reference, so neither side ever takes a lock and readers never see a
+    half-updated summary. Readers see the summary as of the last publication.
+
+    The summary is copied on write: whenever the policy stores a unit or changes the cases it is kept for, the
+    front-end takes a copy of it, which is never changed afterwards. Publishing only collects the current copies
+    into a tuple, without converting anything back, and readers convert the units of a snapshot to events on
+    their own thread in get_data. Writes cost one unit copy each and a publication is a C-level pass over the
+    copies, so even publish_every=1 keeps ingestion within a small factor of the bare manager.
+    """
+
+    def __init__(self, manager: MemoryManager, publish_every: int) -> None:
+        """
+        Initialize the front-end and publish the initial, empty snapshot.
+        Args:
+            manager (MemoryManager): The manager to feed, which must not hold any events yet
+                and must only be used through this front-end.
+            publish_every (int): Number of events added between two publications, 1 for snapshots that are always current.
+        Raises:
+            ValueError: If publish_every is smaller than 1, or the manager already holds events.
+        """
+        if publish_every < 1:
+            raise ValueError(f"publish_every must be at least 1, got {publish_every}.")
+        if manager.get_data():
+            raise ValueError("The manager must not hold any events yet, since only units stored from now on are copied.")
+        self.manager: MemoryManager = manager
+        self.publish_every: int = publish_every
+        self.copies = _UnitCopies(manager.policy)
+        manager.policy.add_listener(self.copies)
+        self.event_count: int = 0
+        self.pending: int = 0  # Events added since the last publication
+        self.snapshot: Snapshot = Snapshot(0, 0, ())
+
+    def add_event(self, event: BEvent) -> None:
+        """
+        Add a new event, publishing a snapshot if one is due. Only call from the writer thread.
+        Args:
+            event (BEvent): The event to add.
+        """
+        self.manager.add_event(event)
+        self.event_count += 1
+        self.pending += 1
+        if self.pending >= self.publish_every:
+            self.publish()
+
+    def add_events(self, events: Iterable[BEvent]) -> None:
+        """
+        Add several events in batches, publishing snapshots when due. Only call from the writer thread.
+        Args:
+            events (Iterable[BEvent]): The events to add, in stream order.
+        """
+        events = iter(events)
+        while True:
+            chunk = list(islice(events, self.publish_every - self.pending))
+            if not chunk:
+                return
+            self.manager.add_events(chunk)
+            self.event_count += len(chunk)
+            self.pending += len(chunk)
+            if self.pending >= self.publish_every:
+                self.publish()
+
+    def publish(self) -> None:
+        """
+        Publish a snapshot of the current summary. Only call from the writer thread.
+        """
+        self.snapshot = Snapshot(self.snapshot.version + 1, self.event_count, self.copies.freeze())
+        self.pending = 0
+
+    def get_snapshot(self) -> Snapshot:
+        """
+        Return the latest published snapshot. Safe to call from any thread.
+        Returns:
+            Snapshot: The snapshot.
+        """
+        return self.snapshot
+
+    def get_data(self) -> List[BEvent]:
+        """
+        Retrieve the managed events of the latest published snapshot, converted on the calling thread.
+        Safe to call from any thread.
+        Returns:
+            List[BEvent]: The list of managed events.
+        """
+        return self.manager.handler.convert_back(list(self.snapshot.units))
@@ -0,0 +1,133 @@
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+
+class CaseIdList:
+    """
+    Ordered list of case IDs, possibly with duplicates, bounded to its most recent max_length entries.
+    Used by the counting policies to remember which cases an observable unit was observed in.
+
+    Entries live in a deque next to per-case occurrence counts. Removing a case ID marks its earliest
+    occurrence as a tombstone instead of shifting the deque, and tombstones are dropped when they reach
+    the front or when they outnumber the live entries. Membership, append, removal and truncation are O(1) amortized.
+    """
+
+    def __init__(self, max_length: int) -> None:
+        """
+        Initialize an empty list.
+        Args:
+            max_length (int): Maximum number of case IDs to keep; older ones are dropped first.
+        """
+        self.max_length: int = max_length
+        self.entries: Deque[str] = deque()
+        self.counts: Dict[str, int] = {}  # Live occurrences per case ID
+        self.tombstones: Dict[str, int] = {}  # Removed earliest occurrences per case ID still in entries
+        self.size: int = 0
+
+    def append(self, case_id: str) -> Optional[str]:
+        """
+        Append a case ID, dropping the oldest one if the list grows over max_length.
+        Args:
+            case_id (str): The case ID to append.
+        Returns:
+            Optional[str]: The dropped case ID, or None if nothing was dropped.
+        """
+        self.entries.append(case_id)
+        self.counts[case_id] = self.counts.get(case_id, 0) + 1
+        self.size += 1
+        if self.size > self.max_length:
+            return self._pop_oldest()
+        return None
+
+    def remove(self, case_id: str) -> None:
+        """
+        Remove the earliest occurrence of a case ID.
+        Args:
+            case_id (str): The case ID to remove.
+        Raises:
+            ValueError: If the case ID is not in the list.
+        """
+        count = self.counts.get(case_id)
+        if count is None:
+            raise ValueError(f"{case_id} is not in the list")
+        if count == 1:
+            del self.counts[case_id]
+        else:
+            self.counts[case_id] = count - 1
+        self.size -= 1
+        self.tombstones[case_id] = self.tombstones.get(case_id, 0) + 1
+        if len(self.entries) > 2 * self.size:
+            self.entries = deque(self)
+            self.tombstones.clear()
+
+    def _pop_oldest(self) -> str:
+        """
+        Drop the oldest live case ID, discarding any tombstones in front of it.
+        Returns:
+            str: The dropped case ID.
+        """
+        while True:
+            case_id = self.entries.popleft()
+            removed = self.tombstones.get(case_id)
+            if removed:
+                if removed == 1:
+                    del self.tombstones[case_id]
+                else:
+                    self.tombstones[case_id] = removed - 1
+                continue
+            count = self.counts[case_id]
+            if count == 1:
+                del self.counts[case_id]
+            else:
+                self.counts[case_id] = count - 1
+            self.size -= 1
+            return case_id
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterate over the live case IDs from oldest to newest.
+        Returns:
+            Iterator[str]: The case IDs.
+        """
+        if not self.tombstones:
+            return iter(self.entries)
+        return self._iter_live()
+
+    def _iter_live(self) -> Iterator[str]:
+        """
+        Iterate over the live case IDs, skipping tombstones.
+        Returns:
+            Iterator[str]: The case IDs.
+        """
+        skip = dict(self.tombstones)
+        for case_id in self.entries:
+            if skip.get(case_id):
+                skip[case_id] -= 1
+            else:
+                yield case_id
+
+    def __contains__(self, case_id: object) -> bool:
+        """
+        Check whether a case ID is in the list.
+        Args:
+            case_id: The case ID to look up.
+        Returns:
+            bool: True if it occurs at least once.
+        """
+        return case_id in self.counts
+
+    def __len__(self) -> int:
+        """
+        Return the number of case IDs, counting duplicates.
+        Returns:
+            int: The number of live entries.
+        """
+        return self.size
+
+    def distinct(self) -> Iterator[str]:
+        """
+        Iterate over the distinct case IDs in the list.
+        Returns:
+            Iterator[str]: The distinct case IDs.
+        """
+        return iter(self.counts)
@@ -0,0 +1,98 @@
+import sys
+from typing import Dict, Hashable, List
+
+from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+
+
+class CaseIndex:
+    """
+    Index from case IDs to the mergeable observable units a policy currently stores for them.
+    Policies keep it in sync on every insert, removal and eviction, so that
+    get_mergeable_elements is a dictionary lookup instead of a scan over the whole store.
+    """
+
+    CASE_BYTES: int = 190  # Estimated dictionary per indexed case, measured with pympler
+    ENTRY_BYTES: int = 45  # Estimated handle and dictionary slot per registered unit, measured with pympler
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty index.
+        """
+        self.units: Dict[str, Dict[Hashable, BaseObservableUnit]] = {}
+        self.size: int = 0  # Number of registered units over all cases
+
+    def add(self, case_id: str, key: Hashable, unit: BaseObservableUnit) -> None:
+        """
+        Register a unit for a case.
+        Args:
+            case_id (str): The case the unit belongs to.
+            key (Hashable): Policy specific handle of the stored unit, used to remove it later.
+            unit (BaseObservableUnit): The stored unit.
+        """
+        case_units = self.units.get(case_id)
+        if case_units is None:
+            self.units[case_id] = {key: unit}
+            self.size += 1
+        else:
+            if key not in case_units:
+                self.size += 1
+            case_units[key] = unit
+
+    def remove(self, case_id: str, key: Hashable) -> None:
+        """
+        Unregister a unit of a case. Unknown keys are ignored.
+        Args:
+            case_id (str): The case the unit belongs to.
+            key (Hashable): The handle the unit was registered with.
+        """
+        case_units = self.units.get(case_id)
+        if case_units is not None:
+            if case_units.pop(key, None) is not None:
+                self.size -= 1
+            if not case_units:
+                del self.units[case_id]
+
+    def get(self, case_id: str) -> Dict[Hashable, BaseObservableUnit]:
+        """
+        Return the registered units of a case, keyed by their handles, in insertion order.
+        Args:
+            case_id (str): The case identifier.
+        Returns:
+            Dict[Hashable, BaseObservableUnit]: The registered units, empty if there are none.
+        """
+        return self.units.get(case_id, {})
+
+    def get_units(self, case_id: str) -> List[BaseObservableUnit]:
+        """
+        Return the registered units of a case in insertion order.
+        Args:
+            case_id (str): The case identifier.
+        Returns:
+            List[BaseObservableUnit]: The registered units.
+        """
+        case_units = self.units.get(case_id)
+        return list(case_units.values()) if case_units else []
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the index.
+        """
+        self.units.clear()
+        self.size = 0
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the index, from its number of cases and registered units.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return (sys.getsizeof(self) + sys.getsizeof(self.units)
+                + len(self.units) * self.CASE_BYTES + self.size * self.ENTRY_BYTES)
+
+    def __len__(self) -> int:
+        """
+        Return the number of cases with at least one registered unit.
+        Returns:
+            int: The number of indexed cases.
+        """
+        return len(self.units)
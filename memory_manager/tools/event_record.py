@@ -0,0 +1,78 @@
+import sys
+from datetime import datetime
+from typing import Optional
+
+from pybeamline.bevent import BEvent
+
+
+class EventRecord:
+    """
+    Compact internal copy of a BEvent, keeping only its event name, case ID, process name and time.
+    Records are never modified after creation, so units can share them between clones.
+    They offer the same getters as BEvent and are turned back into BEvent objects by to_event.
+    """
+
+    __slots__ = ("name", "case", "process", "time")
+
+    def __init__(self, name: str, case: str, process: Optional[str], time: Optional[datetime]) -> None:
+        """
+        Initialize the record.
+        Args:
+            name (str): The activity name.
+            case (str): The case ID.
+            process (Optional[str]): The process name.
+            time (Optional[datetime]): The event time.
+        """
+        self.name = name
+        self.case = case
+        self.process = process
+        self.time = time
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the record and its event time. The strings are shared with the stream and not counted.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self) + (sys.getsizeof(self.time) if self.time is not None else 0)
+
+    @staticmethod
+    def from_event(event: BEvent) -> "EventRecord":
+        """
+        Create a record from a BEvent.
+        Args:
+            event (BEvent): The event to copy.
+        Returns:
+            EventRecord: The record.
+        """
+        return EventRecord(event.get_event_name(), event.get_trace_name(), event.get_process_name(), event.get_event_time())
+
+    def to_event(self) -> BEvent:
+        """
+        Create a BEvent from the record.
+        Returns:
+            BEvent: The event.
+        """
+        return BEvent(self.name, self.case, self.process, self.time)
+
+    def with_case_id(self, case_id: str) -> "EventRecord":
+        """
+        Return a copy of the record with a new case ID.
+        Args:
+            case_id (str): The new case ID.
+        Returns:
+            EventRecord: The relabelled record.
+        """
+        return EventRecord(self.name, case_id, self.process, self.time)
+
+    def get_event_name(self) -> str:
+        return self.name
+
+    def get_trace_name(self) -> str:
+        return self.case
+
+    def get_process_name(self) -> Optional[str]:
+        return self.process
+
+    def get_event_time(self) -> Optional[datetime]:
+        return self.time
@@ -38,6 +38,21 @@ class MemoryManagerHelper:
         event_name2 = event2.get_event_name() if event2 is not None else None
         return event_name1 == event_name2
 
+    @staticmethod
+    def event_key(event: BEvent) -> tuple:
+        """
+        Return the identity of a BEvent as a hashable key of event name, trace name, and event time.
+        Args:
+            event (BEvent): The event.
+        Returns:
+            tuple: The key.
+        """
+        return (
+            event.get_event_name(),
+            event.get_trace_name(),
+            event.get_event_time()
+        )
+
     @staticmethod
     def event_hash(event: BEvent) -> int:
         """
@@ -49,11 +64,7 @@ class MemoryManagerHelper:
         """
         if event is None:
             return 0
-        return hash((
-            event.get_event_name(),
-            event.get_trace_name(),
-            event.get_event_time()
-        ))
+        return hash(MemoryManagerHelper.event_key(event))
 
     @staticmethod
     def intersect_with_custom_eq(list1: List[BEvent], list2: List[BEvent], eq_func: Callable[[BEvent, BEvent], bool]) -> List[BEvent]:
@@ -0,0 +1,103 @@
+from types import MappingProxyType
+from typing import Dict, Hashable, Iterable, KeysView, Mapping, Tuple, override
+
+from memory_manager.observable_unit_tools.units.base_observable_unit import BaseObservableUnit
+from memory_manager.observable_unit_tools.units.event_sequence_observable_unit import EventSequenceObservableUnit
+from memory_manager.policies.policy_listener import PolicyListener
+
+
+def _add(counts: Dict[Hashable, int], keys: Iterable[Hashable]) -> None:
+    """
+    Count every key once more.
+    Args:
+        counts (Dict[Hashable, int]): The counts to update.
+        keys (Iterable[Hashable]): The keys, with repetitions.
+    """
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+
+
+def _subtract(counts: Dict[Hashable, int], keys: Iterable[Hashable]) -> None:
+    """
+    Count every key once less, dropping keys whose count reaches zero.
+    Args:
+        counts (Dict[Hashable, int]): The counts to update.
+        keys (Iterable[Hashable]): The keys, with repetitions.
+    """
+    for key in keys:
+        count = counts[key]
+        if count == 1:
+            del counts[key]
+        else:
+            counts[key] = count - 1
+
+
+class SummaryViews(PolicyListener):
+    """
+    Activities, directly-follows relations and variants of the units a policy stores, kept up to date
+    as the policy notifies about stored and dropped units, so reading them never scans the summary.
+
+    Every view counts occurrences over the stored units: activities over all events, and relations between
+    consecutive events and variants over units holding an event sequence (traces and variants). Relations
+    and variants are only those of the summary's cases if every unit holds a whole case, so events and DFRs,
+    whose cases are spread over independently evicted units, only contribute activities.
+    Updates cost O(length of the unit), queries return live read-only views in O(1).
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize empty views.
+        """
+        self.activities: Dict[str, int] = {}  # {activity: occurrences}
+        self.dfg: Dict[Tuple[str, str], int] = {}  # {(activity, following activity): occurrences}
+        self.variants: Dict[Tuple[str, ...], int] = {}  # {activity sequence: number of units}
+
+    @override
+    def unit_added(self, unit: BaseObservableUnit) -> None:
+        """
+        Count the activities, relations and variant of a stored unit.
+        Args:
+            unit (BaseObservableUnit): The stored unit.
+        """
+        names = unit.get_activity_names()
+        _add(self.activities, names)
+        if isinstance(unit, EventSequenceObservableUnit):
+            _add(self.dfg, zip(names, names[1:]))
+            _add(self.variants, (names,))
+
+    @override
+    def unit_removed(self, unit: BaseObservableUnit) -> None:
+        """
+        Uncount the activities, relations and variant of a dropped unit.
+        Args:
+            unit (BaseObservableUnit): The dropped unit.
+        """
+        names = unit.get_activity_names()
+        _subtract(self.activities, names)
+        if isinstance(unit, EventSequenceObservableUnit):
+            _subtract(self.dfg, zip(names, names[1:]))
+            _subtract(self.variants, (names,))
+
+    def get_activities(self) -> KeysView[str]:
+        """
+        Return the activities occurring in the stored units.
+        Returns:
+            KeysView[str]: A live, set-like view of the activities.
+        """
+        return self.activities.keys()
+
+    def get_dfg(self) -> Mapping[Tuple[str, str], int]:
+        """
+        Return the directly-follows graph of the stored event sequences.
+        Returns:
+            Mapping[Tuple[str, str], int]: A live, read-only view of the occurrences of every relation.
+        """
+        return MappingProxyType(self.dfg)
+
+    def get_variants(self) -> Mapping[Tuple[str, ...], int]:
+        """
+        Return the variants of the stored event sequences.
+        Returns:
+            Mapping[Tuple[str, ...], int]: A live, read-only view of the number of units of every activity sequence.
+        """
+        return MappingProxyType(self.variants)
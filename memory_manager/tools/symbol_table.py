@@ -0,0 +1,63 @@
+import sys
+from typing import Dict, Hashable, List
+
+
+class SymbolTable:
+    """
+    Interns values such as activity names and process names as small integers.
+    Observable units store the integers instead of the values, so a value is kept only once per table.
+    Symbols are never released, a table only grows with the number of distinct values seen, so only intern
+    values from a bounded domain and not, for example, the case IDs of a stream.
+    """
+
+    SYMBOL_BYTES: int = 28  # Size of a symbol outside the small integer cache
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty table.
+        """
+        self.ids: Dict[Hashable, int] = {}  # {value: symbol}
+        self.values: List[Hashable] = []  # Value of each symbol
+        self.value_bytes: int = 0  # Size of the values and their symbols, for estimated_bytes
+
+    def intern(self, value: Hashable) -> int:
+        """
+        Return the symbol of a value, assigning the next free one if the value is new.
+        Args:
+            value (Hashable): The value to intern.
+        Returns:
+            int: The symbol of the value.
+        """
+        symbol = self.ids.get(value)
+        if symbol is None:
+            symbol = len(self.values)
+            self.ids[value] = symbol
+            self.values.append(value)
+            self.value_bytes += sys.getsizeof(value) + self.SYMBOL_BYTES
+        return symbol
+
+    def lookup(self, symbol: int) -> Hashable:
+        """
+        Return the value of a symbol.
+        Args:
+            symbol (int): A symbol returned by intern.
+        Returns:
+            Hashable: The interned value.
+        """
+        return self.values[symbol]
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the table, kept up to date as values are interned.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.ids) + sys.getsizeof(self.values) + self.value_bytes
+
+    def __len__(self) -> int:
+        """
+        Return the number of interned values.
+        Returns:
+            int: The number of symbols.
+        """
+        return len(self.values)
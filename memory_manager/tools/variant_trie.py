@@ -0,0 +1,95 @@
+import sys
+import weakref
+from typing import List, Optional, Tuple
+
+from memory_manager.tools.symbol_table import SymbolTable
+
+
+class VariantNode:
+    """
+    Node of a VariantTrie, standing for the activity sequence on the path from the root to it.
+    A node keeps its parent alive, so a variant keeps all of its prefixes.
+    """
+
+    __slots__ = ("id", "parent", "activity", "__weakref__")
+
+    def __init__(self, node_id: int, parent: Optional["VariantNode"], activity: int) -> None:
+        """
+        Initialize the node.
+        Args:
+            node_id (int): Unique id of the node within its trie.
+            parent (Optional[VariantNode]): The parent node, None for the root.
+            activity (int): Symbol of the last activity of the sequence, -1 for the root.
+        """
+        self.id = node_id
+        self.parent = parent
+        self.activity = activity
+
+    def activities(self) -> List[int]:
+        """
+        Return the activity symbols on the path from the root to the node.
+        Returns:
+            List[int]: The activity symbols, in order.
+        """
+        ret = []
+        node = self
+        while node.parent is not None:
+            ret.append(node.activity)
+            node = node.parent
+        ret.reverse()
+        return ret
+
+
+class VariantTrie:
+    """
+    Prefix tree of activity sequences, storing every prefix shared by several variants once.
+    There is exactly one live node per sequence, so a node identifies its variant.
+    Children are looked up by (parent id, activity symbol) in a weak dictionary: a node is dropped
+    as soon as no unit and no child refers to it, so the trie only holds variants that are still stored.
+    """
+
+    NODE_BYTES: int = 100  # Estimated node, key and weak reference per live node, measured with pympler
+
+    def __init__(self, symbols: SymbolTable) -> None:
+        """
+        Initialize an empty trie.
+        Args:
+            symbols (SymbolTable): The symbol table the activity symbols come from.
+        """
+        self.symbols: SymbolTable = symbols
+        self.root: VariantNode = VariantNode(0, None, -1)
+        self.children: weakref.WeakValueDictionary[Tuple[int, int], VariantNode] = weakref.WeakValueDictionary()
+        self.next_id: int = 1
+
+    def child(self, node: VariantNode, activity: int) -> VariantNode:
+        """
+        Return the node of the sequence of a node extended by one activity, creating it if needed.
+        Args:
+            node (VariantNode): The node to extend.
+            activity (int): The activity symbol to append.
+        Returns:
+            VariantNode: The child node.
+        """
+        key = (node.id, activity)
+        child = self.children.get(key)
+        if child is None:
+            child = VariantNode(self.next_id, node, activity)
+            self.next_id += 1
+            self.children[key] = child
+        return child
+
+    def __len__(self) -> int:
+        """
+        Return the number of live nodes, without the root.
+        Returns:
+            int: The number of nodes.
+        """
+        return len(self.children)
+
+    def estimated_bytes(self) -> int:
+        """
+        Estimate the memory held by the trie from its number of live nodes.
+        Returns:
+            int: The estimated size in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self.children.data) + len(self.children) * self.NODE_BYTES